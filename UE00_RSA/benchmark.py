@@ -0,0 +1,232 @@
+__author__ = "Luka Pacar"
+
+import argparse
+import gc
+import multiprocessing
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from rsa import generate_keys, crt_pow, encrypt_file, decrypt_file, hybrid_encrypt_file, hybrid_decrypt_file, save_key
+
+
+def benchmark_crt(key_sizes: list[int], blocks: int = 50) -> list[tuple[int, float, float]]:
+    """
+    Compares plain decryption pow(c, d, n) with CRT decryption for different key sizes.
+
+    :param key_sizes: The key sizes in bits to test.
+    :param blocks: Number of ciphertext blocks to decrypt per key size.
+    :return: list of (key_size, plain_ms_per_block, crt_ms_per_block)
+    """
+    results = []
+    for key_size in key_sizes:
+        public, private = generate_keys(key_size)
+        e, n, _ = public
+        d, _, _, p, q, dp, dq, q_inv = private
+        ciphertexts = [pow(random.randrange(n), e, n) for _ in range(blocks)]
+
+        start_time = time.perf_counter()
+        plain = [pow(c, d, n) for c in ciphertexts]
+        plain_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        crt = [crt_pow(c, p, q, dp, dq, q_inv) for c in ciphertexts]
+        crt_time = time.perf_counter() - start_time
+
+        assert plain == crt
+        results.append((key_size, plain_time * 1000 / blocks, crt_time * 1000 / blocks))
+    return results
+
+
+def benchmark_hybrid(key_sizes: list[int], file_size: int = 1 << 20) -> list[tuple[int, str, float, float]]:
+    """
+    Compares the throughput of the RSA block mode with the hybrid container.
+
+    :param key_sizes: The key sizes in bits to test.
+    :param file_size: Size of the random test file in bytes.
+    :return: list of (key_size, mode, encrypt_mb_per_s, decrypt_mb_per_s)
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        plain = os.path.join(directory, "plain.bin")
+        encrypted = os.path.join(directory, "plain.enc")
+        decrypted = os.path.join(directory, "plain.dec")
+        with open(plain, "wb") as f:
+            f.write(random.randbytes(file_size))
+
+        for key_size in key_sizes:
+            public, private = generate_keys(key_size)
+            modes = {
+                "block": (lambda: encrypt_file(plain, encrypted, public), lambda: decrypt_file(encrypted, decrypted, private)),
+                "hybrid": (lambda: hybrid_encrypt_file(plain, encrypted, public), lambda: hybrid_decrypt_file(encrypted, decrypted, private)),
+            }
+            for mode, (encrypt, decrypt) in modes.items():
+                start_time = time.perf_counter()
+                encrypt()
+                encrypt_time = time.perf_counter() - start_time
+
+                start_time = time.perf_counter()
+                decrypt()
+                decrypt_time = time.perf_counter() - start_time
+
+                megabytes = file_size / 1e6
+                results.append((key_size, mode, megabytes / encrypt_time, megabytes / decrypt_time))
+    return results
+
+
+def _measure_encryption(plain: str, encrypted: str, key, use_mmap: bool, results: multiprocessing.Queue):
+    """
+    Runs one encryption in a fresh process and reports time, retained blocks (sys.getallocatedblocks delta
+    after gc: memory blocks still alive after the run, not the temporary allocations), traced peak and peak RSS.
+    """
+    gc.collect()
+    tracemalloc.start()
+    allocated_before = sys.getallocatedblocks()
+    start_time = time.perf_counter()
+    encrypt_file(plain, encrypted, key, use_mmap=use_mmap)
+    taken_time = time.perf_counter() - start_time
+    gc.collect()
+    retained = sys.getallocatedblocks() - allocated_before
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results.put((taken_time, retained, traced_peak, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def benchmark_mmap(key_sizes: list[int], file_size: int = 1 << 20) -> list[tuple[int, str, float, float, int, int]]:
+    """
+    Compares the chunked block mode with the memory-mapped block mode. Every run happens in its own
+    process, so the peak RSS belongs to that run only.
+
+    :param key_sizes: The key sizes in bits to test.
+    :param file_size: Size of the random test file in bytes.
+    :return: list of (key_size, mode, mb_per_s, retained_blocks_per_block, traced_peak_kb, peak_rss_kb)
+    """
+    results = []
+    queue = multiprocessing.Queue()
+    with tempfile.TemporaryDirectory() as directory:
+        plain = os.path.join(directory, "plain.bin")
+        encrypted = os.path.join(directory, "plain.enc")
+        with open(plain, "wb") as f:
+            for offset in range(0, file_size, 1 << 16):  # in Stücken, damit der Elternprozess klein bleibt
+                f.write(random.randbytes(min(1 << 16, file_size - offset)))
+
+        for key_size in key_sizes:
+            public, _ = generate_keys(key_size)
+            blocks = -(-file_size // ((public[1].bit_length() - 1) // 8))
+            for mode, use_mmap in (("chunked", False), ("mmap", True)):
+                process = multiprocessing.Process(target=_measure_encryption,
+                                                  args=(plain, encrypted, public, use_mmap, queue))
+                process.start()
+                taken_time, retained, traced_peak, peak_rss = queue.get()
+                process.join()
+                results.append((key_size, mode, file_size / 1e6 / taken_time, retained / blocks,
+                                traced_peak // 1024, peak_rss))
+    return results
+
+
+def percentiles(latencies: list[float]) -> tuple[float, float]:
+    """Returns (p50, p99) of the latencies in milliseconds."""
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return cuts[49] * 1000, cuts[98] * 1000
+
+
+def benchmark_server(key_size: int = 2048, requests: int = 500, concurrency: int = 8,
+                     cli_runs: int = 20, message_size: int = 200) -> dict[str, tuple[float, float]]:
+    """
+    Load test: latency of small decrypt requests against rsa_server.py compared with one-shot rsa.py -d calls.
+
+    :param key_size: key size in bits
+    :param requests: number of requests sent to the daemon
+    :param concurrency: number of client threads (one connection each)
+    :param cli_runs: number of one-shot CLI calls
+    :param message_size: plaintext size of one request in bytes
+    :return: {"daemon": (p50_ms, p99_ms), "cli": (p50_ms, p99_ms)}
+    """
+    from rsa_server import DecryptionClient
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as directory:
+        public, private = generate_keys(key_size)
+        key_file = os.path.join(directory, "private.key")
+        save_key(key_file, private)
+        plain = os.path.join(directory, "message.bin")
+        encrypted = os.path.join(directory, "message.enc")
+        with open(plain, "wb") as f:
+            f.write(random.randbytes(message_size))
+        encrypt_file(plain, encrypted, public)
+        with open(encrypted, "rb") as f:
+            ciphertext = f.read()
+
+        socket_path = os.path.join(directory, "rsa.sock")
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.dirname(here), here]))
+        server = subprocess.Popen([sys.executable, os.path.join(here, "rsa_server.py"), "-s", socket_path,
+                                   "-k", directory, "-l", "WARNING"], env=env)
+        try:
+            while not os.path.exists(socket_path):
+                time.sleep(0.05)
+
+            def client_run(count: int) -> list[float]:
+                client = DecryptionClient(socket_path)
+                latencies = []
+                for _ in range(count):
+                    start_time = time.perf_counter()
+                    client.decrypt(key_file, ciphertext)
+                    latencies.append(time.perf_counter() - start_time)
+                client.close()
+                return latencies
+
+            with ThreadPoolExecutor(max_workers=concurrency) as threads:
+                parts = threads.map(client_run, [requests // concurrency] * concurrency)
+                daemon_latencies = [latency for part in parts for latency in part]
+        finally:
+            server.terminate()
+            server.wait()
+
+        cli_latencies = []
+        for _ in range(cli_runs):
+            start_time = time.perf_counter()
+            subprocess.run([sys.executable, os.path.join(here, "rsa.py"), "-d", encrypted, "-k", key_file,
+                            "-o", os.path.join(directory, "message.dec")], env=env, check=True, stdout=subprocess.DEVNULL)
+            cli_latencies.append(time.perf_counter() - start_time)
+
+    return {"daemon": percentiles(daemon_latencies), "cli": percentiles(cli_latencies)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for the RSA implementation.")
+    parser.add_argument("benchmark", choices=["crt", "hybrid", "mmap", "server"],
+                        help="crt: compare CRT and plain decryption, hybrid: compare block mode and hybrid container, "
+                             "mmap: compare chunked and memory-mapped block mode, "
+                             "server: latency of rsa_server.py compared with the one-shot CLI")
+    parser.add_argument("-s", "--sizes", type=int, nargs="+", default=[512, 1024, 2048, 4096],
+                        help="Key sizes in bits (default: 512 1024 2048 4096)")
+    parser.add_argument("-b", "--blocks", type=int, default=50, help="Blocks per measurement (default: 50)")
+    parser.add_argument("-f", "--file-size", type=int, default=1 << 20, help="Test file size in bytes (default: 1 MiB)")
+    parser.add_argument("-r", "--requests", type=int, default=500, help="Requests for the server load test (default: 500)")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="Client threads for the server load test (default: 8)")
+    args = parser.parse_args()
+
+    if args.benchmark == "crt":
+        print(f"{'bits':>6} {'plain ms':>10} {'crt ms':>10} {'speedup':>8}")
+        for key_size, plain_ms, crt_ms in benchmark_crt(args.sizes, args.blocks):
+            print(f"{key_size:>6} {plain_ms:>10.3f} {crt_ms:>10.3f} {plain_ms / crt_ms:>7.2f}x")
+    elif args.benchmark == "hybrid":
+        print(f"{'bits':>6} {'mode':>8} {'enc MB/s':>10} {'dec MB/s':>10}")
+        for key_size, mode, encrypt_speed, decrypt_speed in benchmark_hybrid(args.sizes, args.file_size):
+            print(f"{key_size:>6} {mode:>8} {encrypt_speed:>10.3f} {decrypt_speed:>10.3f}")
+    elif args.benchmark == "mmap":
+        print(f"{'bits':>6} {'mode':>8} {'MB/s':>8} {'retained/block':>15} {'traced peak KB':>15} {'peak RSS KB':>12}")
+        for key_size, mode, speed, retained, traced_peak, peak_rss in benchmark_mmap(args.sizes, args.file_size):
+            print(f"{key_size:>6} {mode:>8} {speed:>8.3f} {retained:>15.3f} {traced_peak:>15} {peak_rss:>12}")
+    elif args.benchmark == "server":
+        print(f"{'bits':>6} {'mode':>8} {'p50 ms':>10} {'p99 ms':>10}")
+        for key_size in args.sizes:
+            for mode, (p50, p99) in benchmark_server(key_size, args.requests, args.concurrency).items():
+                print(f"{key_size:>6} {mode:>8} {p50:>10.2f} {p99:>10.2f}")
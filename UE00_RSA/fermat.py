@@ -1,6 +1,93 @@
 __author__ = "Luka Pacar"
 
+import argparse
+import os
+import struct
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+try:
+    import millerrabin  # als Skript aus UE00_RSA/ gestartet
+except ImportError:
+    from UE00_RSA import millerrabin
+
+try:
+    import numpy as np
+except ImportError:  # ohne NumPy wird pro Basis mit pow gerechnet
+    np = None
+
+# (n - 1)^2 muss in uint64 passen, damit result * base nicht überläuft
+NUMPY_MAX_MODULUS = 1 << 32
+
+
+class FermatStatistics(NamedTuple):
+    n: int
+    counts: Counter          # Ergebnis von i^(n-1) mod n -> Anzahl der Basen i
+    liars: list[int]         # Basen mit i^(n-1) = 1 mod n
+    witnesses: list[int]     # Basen mit i^(n-1) != 1 mod n
+
+    @property
+    def liar_percentage(self) -> float:
+        return len(self.liars) / (self.n - 1) * 100
+
+    def __str__(self):
+        c = self.counts
+        return f"{self.n} -> {self.liar_percentage:.0f}% -> res[1]={c[1]}, len(res)={len(c)} - {list(c.items())}"
+
+
+def powers_of_all_bases(n: int, exponent: int):
+    """
+    Calculates i^exponent mod n for all bases i = 1 .. n-1.
+    For moduli below NUMPY_MAX_MODULUS all bases are exponentiated at once as a NumPy array.
+
+    :param n: the modulus (n >= 2)
+    :param exponent: the exponent
+    :return: NumPy array (or list without NumPy), index i-1 belongs to base i
+    """
+    if np is None or n >= NUMPY_MAX_MODULUS:
+        return [pow(i, exponent, n) for i in range(1, n)]
+
+    base = np.arange(1, n, dtype=np.uint64)
+    result = np.ones(n - 1, dtype=np.uint64)
+    modulus = np.uint64(n)
+    while exponent > 0:
+        if exponent & 1:
+            result = result * base % modulus
+        base = base * base % modulus
+        exponent >>= 1
+    return result % modulus
+
+
+def fermat_residues(n: int) -> list[int]:
+    """
+    Calculates i^(n-1) mod n for all bases i = 1 .. n-1.
+
+    :param n: the modulus (n >= 2)
+    :return: list of residues, index i-1 belongs to base i
+
+    >>> fermat_residues(9)
+    [1, 4, 0, 7, 7, 0, 4, 1]
+    """
+    residues = powers_of_all_bases(n, n - 1)
+    return residues if isinstance(residues, list) else residues.tolist()
+
+
+def fermat_statistics(n: int) -> FermatStatistics:
+    """
+    Calculates the fermat test results of all bases 1 .. n-1 for n.
+
+    :param n: the number to get fermat-statistics from.
+    :return: FermatStatistics with residue counts, fermat liars and witnesses
+
+    >>> stats = fermat_statistics(15)
+    >>> stats.liars, len(stats.witnesses)
+    ([1, 4, 11, 14], 10)
+    """
+    residues = fermat_residues(n)
+    liars = [i for i, residue in enumerate(residues, 1) if residue == 1]
+    witnesses = [i for i, residue in enumerate(residues, 1) if residue != 1]
+    return FermatStatistics(n, Counter(residues), liars, witnesses)
 
 
 def get_fermat_statistics(n: int) -> str:
@@ -8,27 +95,215 @@ def get_fermat_statistics(n: int) -> str:
     Returns a string with fermat-output information of the given number.
     :param n: the number to get fermat-statistics from.
     :return: number -> percentage_to_be_prime -> number_of_is_prime_results, number_of_different_results - map of all number results
+
+    >>> get_fermat_statistics(11)
+    '11 -> 100% -> res[1]=10, len(res)=1 - [(1, 10)]'
     """
-    c = Counter()
-    for i in range(1, n):
-        fermat_result = (i ** (n - 1)) % n
-        c[fermat_result] += 1
+    return str(fermat_statistics(n))
 
-    return f"{n} -> {(c[1] / (n - 1) * 100):.0f}% -> res[1]={c[1]}, len(res)={len(c)} - {list(c.items())}"
+
+def sweep_fermat_statistics(numbers, workers: int = 1) -> list[FermatStatistics]:
+    """
+    Calculates fermat_statistics for many n, optionally on a process pool.
+
+    :param numbers: iterable of n
+    :param workers: number of worker processes (1 = serial)
+    :return: list of FermatStatistics in the order of numbers
+    """
+    if workers <= 1:
+        return [fermat_statistics(n) for n in numbers]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fermat_statistics, numbers, chunksize=16))
+
+
+def is_carmichael(n: int) -> bool:
+    """
+    Checks if n is a Carmichael number (every base coprime to n is a fermat liar)
+    with Korselt's criterion: n is composite, squarefree and p - 1 | n - 1 for every prime p | n.
+
+    :param n: the number to check
+    :return: True if n is a Carmichael number
+
+    >>> import math
+    >>> all(is_carmichael(n) == (n > 2 and len(fermat_statistics(n).liars) == sum(math.gcd(i, n) == 1 for i in range(1, n))
+    ...     and len(fermat_statistics(n).liars) < n - 1) for n in range(3, 2000, 2))
+    True
+    """
+    if n < 3 or n % 2 == 0:
+        return False
+    rest = n
+    factors = 0
+    p = 3
+    while p * p <= rest:
+        if rest % p == 0:
+            rest //= p
+            if rest % p == 0 or (n - 1) % (p - 1) != 0:
+                return False
+            factors += 1
+        p += 2
+    if rest > 1:
+        if rest == n or (n - 1) % (rest - 1) != 0:
+            return False
+        factors += 1
+    return factors >= 2
+
+
+def liar_counts(n: int) -> tuple[int, int, int]:
+    """
+    Counts the fermat liars (i^(n-1) = 1) and strong liars (n is a strong probable prime to base i)
+    among the bases i = 1 .. n-1.
+
+    :param n: the number to check (n >= 2)
+    :return: (n, fermat_liars, strong_liars)
+
+    >>> liar_counts(561), liar_counts(2047)[2]
+    ((561, 320, 10), 242)
+    """
+    d, r = n - 1, 0
+    while d > 0 and d % 2 == 0:
+        d //= 2
+        r += 1
+
+    x = powers_of_all_bases(n, d)
+    if isinstance(x, list):
+        strong_liars = 0
+        fermat_liars = 0
+        for value in x:
+            strong = value == 1 or value == n - 1
+            for i in range(r):
+                value = value * value % n  # nach r Quadrierungen: i^(n-1)
+                if i < r - 1 and value == n - 1:
+                    strong = True
+            fermat_liars += value == 1
+            strong_liars += strong
+        return n, fermat_liars, strong_liars
+
+    minus_one = np.uint64(n - 1)
+    strong = (x == 1) | (x == minus_one)
+    modulus = np.uint64(n)
+    for i in range(r):
+        x = x * x % modulus
+        if i < r - 1:
+            strong |= x == minus_one
+    return n, int(np.count_nonzero(x == 1)), int(np.count_nonzero(strong))
+
+
+# Census-Datei: ein Datensatz pro n (n, fermat_liars, strong_liars), little endian
+CENSUS_RECORD = struct.Struct("<QII")
+
+
+def load_census(filename: str) -> dict[int, tuple[int, int]]:
+    """
+    Loads a census file. An incomplete last record (interrupted write) is cut off.
+
+    :param filename: path of the census file
+    :return: n -> (fermat_liars, strong_liars)
+    """
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, "rb") as f:
+        data = f.read()
+    complete = len(data) - len(data) % CENSUS_RECORD.size
+    if complete != len(data):
+        with open(filename, "r+b") as f:
+            f.truncate(complete)
+    return {n: (fermat, strong) for n, fermat, strong in CENSUS_RECORD.iter_unpack(data[:complete])}
+
+
+def census(start: int, stop: int, filename: str, workers: int = 1) -> dict[int, tuple[int, int]]:
+    """
+    Counts fermat liars and strong liars for all n in [start, stop) and appends them to the census file.
+    n already contained in the file are skipped, so an interrupted census can simply be restarted.
+
+    :param start: first n (>= 2)
+    :param stop: upper bound (exclusive)
+    :param filename: path of the census file
+    :param workers: number of worker processes (1 = serial)
+    :return: n -> (fermat_liars, strong_liars) for all n in the range
+    """
+    cache = load_census(filename)
+    missing = [n for n in range(max(start, 2), stop) if n not in cache]
+
+    with open(filename, "ab") as f:
+        if workers <= 1:
+            results = map(liar_counts, missing)
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            results = pool.map(liar_counts, missing, chunksize=16)
+        try:
+            for i, (n, fermat, strong) in enumerate(results, 1):
+                f.write(CENSUS_RECORD.pack(n, fermat, strong))
+                cache[n] = (fermat, strong)
+                if i % 256 == 0:
+                    f.flush()
+        finally:
+            if workers > 1:
+                pool.shutdown(cancel_futures=True)
+
+    return {n: cache[n] for n in range(max(start, 2), stop)}
+
+
+def _carmichael_in_range(bounds: tuple[int, int]) -> list[int]:
+    start, stop = bounds
+    return [n for n in range(start | 1, stop, 2) if is_carmichael(n)]
+
+
+def carmichael_numbers(limit: int, workers: int = 1, chunk: int = 50_000) -> list[int]:
+    """
+    Finds all Carmichael numbers below limit, the range is split into chunks for the process pool.
+
+    :param limit: upper bound (exclusive)
+    :param workers: number of worker processes (1 = serial)
+    :param chunk: size of the subranges
+    :return: sorted list of Carmichael numbers
+
+    >>> carmichael_numbers(10_000)
+    [561, 1105, 1729, 2465, 2821, 6601, 8911]
+    """
+    ranges = [(start, min(start + chunk, limit)) for start in range(0, limit, chunk)]
+    if workers <= 1:
+        parts = map(_carmichael_in_range, ranges)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_carmichael_in_range, ranges))
+    return [n for part in parts for n in part]
 
 
 if __name__ == "__main__":
-    # Aufgabe 1:
-    # Berechne (in Python) für jede der Primzahlen 𝑝 = 2 bis 𝑝 = 11 und 𝑝 = 997:
-    print("Aufgabe 1:")
-    print(get_fermat_statistics(2))
-    print(get_fermat_statistics(11))
-    print(get_fermat_statistics(997))
-    print()
-    # Alle 3 sind primzahlen (es kommt immer zu 100% 1 raus)
-
-    # Aufgabe 2:
-    # Was passiert bei Nicht-Primzahlen?
-    for n in [2, 3, 5, 7, 11, 997, 9, 15, 21, 551, 552, 553, 554, 555, 556, 557, 558, 559, 560, 561, 562, 563, 564, 565,
-              566, 567, 568, 569, 560, 561, 562, 563, 564, 565, 566, 567, 568, 569, 6601, 8911]:
-        print(get_fermat_statistics(n))
+    parser = argparse.ArgumentParser(description="Fermat statistics and liar census.")
+    parser.add_argument("--census", type=int, nargs=2, metavar=("START", "STOP"),
+                        help="Count fermat liars and strong liars for START <= n < STOP")
+    parser.add_argument("--carmichael", type=int, metavar="LIMIT",
+                        help="Find all Carmichael numbers below LIMIT (f.e. 1000000)")
+    parser.add_argument("-o", "--output", default="census.bin", help="Census file (default: census.bin)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Number of worker processes (default: 1)")
+    args = parser.parse_args()
+
+    if args.census:
+        start, stop = args.census
+        known = len(load_census(args.output))
+        results = census(start, stop, args.output, args.workers)
+        print(f"{len(results)} values in range, {len(load_census(args.output)) - known} new -> {args.output}")
+        composites = [n for n in results if n % 2 == 1 and not millerrabin.is_prime(n)]
+        composites.sort(key=lambda n: results[n][1] / (n - 1), reverse=True)
+        for n in composites[:10]:
+            fermat, strong = results[n]
+            print(f"{n}: {fermat} fermat liars ({fermat / (n - 1) * 100:.1f}%), "
+                  f"{strong} strong liars ({strong / (n - 1) * 100:.1f}%)")
+    elif args.carmichael:
+        print(f"Carmichael-Zahlen < {args.carmichael}:", carmichael_numbers(args.carmichael, args.workers))
+    else:
+        # Aufgabe 1:
+        # Berechne (in Python) für jede der Primzahlen 𝑝 = 2 bis 𝑝 = 11 und 𝑝 = 997:
+        print("Aufgabe 1:")
+        print(get_fermat_statistics(2))
+        print(get_fermat_statistics(11))
+        print(get_fermat_statistics(997))
+        print()
+        # Alle 3 sind primzahlen (es kommt immer zu 100% 1 raus)
+
+        # Aufgabe 2:
+        # Was passiert bei Nicht-Primzahlen?
+        numbers = [2, 3, 5, 7, 11, 997, 9, 15, 21, *range(551, 570), 6601, 8911]
+        for stats in sweep_fermat_statistics(numbers, args.workers):
+            print(stats)
@@ -0,0 +1,163 @@
+__author__ = "Luka Pacar"
+
+import hashlib
+import os
+import struct
+from typing import Tuple, Iterator
+
+# Binärer Schlüssel: Header (Magic, Version, Anzahl Felder, key_len), danach alle Felder außer key_len
+# jeweils als 4-Byte-Länge + big-endian Bytes
+KEY_MAGIC = b"RSAK"
+KEY_HEADER = struct.Struct(">4sBBxxI")
+FIELD_LENGTH = struct.Struct(">I")
+
+# Schlüsselbund: Schlüssel hintereinander, am Ende der Index und eine Fußzeile mit dessen Position
+RING_MAGIC = b"RSAR"
+RING_FOOTER = struct.Struct(">4sBxxxQI")
+RING_ENTRY = struct.Struct(">8s?xxxQI")  # Fingerprint, privat, Offset, Länge
+
+FORMAT_VERSION = 1
+
+
+def encode_key(key: Tuple[int, ...]) -> bytes:
+    """
+    Encodes a key ((e|d), n, key_len[, p, q, dP, dQ, qInv]) as binary container.
+
+    :param key: the key tuple
+    :return: the encoded key
+
+    >>> decode_key(encode_key((65537, 3233, 12)))
+    (65537, 3233, 12)
+    """
+    fields = [key[0], key[1], *key[3:]]
+    parts = [KEY_HEADER.pack(KEY_MAGIC, FORMAT_VERSION, len(fields), key[2])]
+    for field in fields:
+        data = field.to_bytes((field.bit_length() + 7) // 8, "big")
+        parts.append(FIELD_LENGTH.pack(len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def decode_key(data: bytes) -> Tuple[int, ...]:
+    """
+    Decodes a key encoded by encode_key.
+
+    :param data: the encoded key
+    :return: the key tuple ((e|d), n, key_len, ...)
+    """
+    magic, version, count, key_len = KEY_HEADER.unpack_from(data)
+    if magic != KEY_MAGIC or version != FORMAT_VERSION:
+        raise ValueError("not a binary RSA key")
+
+    fields = []
+    offset = KEY_HEADER.size
+    for _ in range(count):
+        (length,) = FIELD_LENGTH.unpack_from(data, offset)
+        offset += FIELD_LENGTH.size
+        fields.append(int.from_bytes(data[offset:offset + length], "big"))
+        offset += length
+    return fields[0], fields[1], key_len, *fields[2:]
+
+
+def is_binary_key(filename: str) -> bool:
+    """Checks if the file starts with the magic bytes of a binary key."""
+    with open(filename, "rb") as f:
+        return f.read(len(KEY_MAGIC)) == KEY_MAGIC
+
+
+def fingerprint(key: Tuple[int, ...]) -> str:
+    """
+    Returns the id of a key: the first 8 bytes of SHA-256 over n as hex.
+    Public and private key of one pair have the same fingerprint.
+
+    :param key: the key tuple
+    :return: 16 hex characters
+
+    >>> fingerprint((65537, 3233, 12)) == fingerprint((2753, 3233, 12))
+    True
+    """
+    n = key[1]
+    return hashlib.sha256(n.to_bytes((n.bit_length() + 7) // 8, "big")).hexdigest()[:16]
+
+
+class Keyring:
+    """
+    File with many binary keys and a fingerprint index at the end.
+    Opening reads only the index, keys are read and decoded on lookup.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.index: dict[tuple[str, bool], tuple[int, int]] = {}  # (fingerprint, privat) -> (offset, länge)
+        self.index_offset = 0
+
+        if os.path.exists(filename) and os.path.getsize(filename) > 0:
+            # fremde Dateien nicht als leeren Schlüsselbund behandeln, add() würde sie überschreiben
+            if os.path.getsize(filename) < RING_FOOTER.size:
+                raise ValueError(f"{filename} is not a keyring")
+            with open(filename, "rb") as f:
+                f.seek(-RING_FOOTER.size, os.SEEK_END)
+                magic, version, self.index_offset, count = RING_FOOTER.unpack(f.read(RING_FOOTER.size))
+                if magic != RING_MAGIC or version != FORMAT_VERSION:
+                    raise ValueError(f"{filename} is not a keyring")
+                f.seek(self.index_offset)
+                table = f.read(count * RING_ENTRY.size)
+            for raw_id, private, offset, length in RING_ENTRY.iter_unpack(table):
+                self.index[(raw_id.hex(), private)] = (offset, length)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[tuple[str, bool]]:
+        return iter(self.index)
+
+    def resolve(self, key_id: str, private: bool) -> str:
+        """
+        Finds the full fingerprint for a (unique) prefix.
+
+        :param key_id: fingerprint or prefix of it
+        :param private: search private (True) or public (False) keys
+        :return: the full fingerprint
+        """
+        matches = [fp for fp, is_private in self.index if is_private == private and fp.startswith(key_id)]
+        if len(matches) != 1:
+            kind = "private" if private else "public"
+            raise KeyError(f"{len(matches)} {kind} keys match {key_id!r}")
+        return matches[0]
+
+    def get(self, key_id: str, private: bool) -> Tuple[int, ...]:
+        """
+        Loads one key from the ring.
+
+        :param key_id: fingerprint or unique prefix of it
+        :param private: load the private (True) or the public (False) key
+        :return: the key tuple
+        """
+        offset, length = self.index[(self.resolve(key_id, private), private)]
+        with open(self.filename, "rb") as f:
+            f.seek(offset)
+            return decode_key(f.read(length))
+
+    def add(self, keys: list[tuple[Tuple[int, ...], bool]]) -> list[str]:
+        """
+        Appends keys to the ring (existing keys with the same id are replaced in the index).
+
+        :param keys: list of (key, private)
+        :return: the fingerprints of the added keys
+        """
+        ids = []
+        with open(self.filename, "r+b" if os.path.exists(self.filename) else "wb") as f:
+            f.seek(self.index_offset)
+            f.truncate()
+            for key, private in keys:
+                data = encode_key(key)
+                key_id = fingerprint(key)
+                self.index[(key_id, private)] = (f.tell(), len(data))
+                f.write(data)
+                ids.append(key_id)
+
+            self.index_offset = f.tell()
+            for (key_id, private), (offset, length) in self.index.items():
+                f.write(RING_ENTRY.pack(bytes.fromhex(key_id), private, offset, length))
+            f.write(RING_FOOTER.pack(RING_MAGIC, FORMAT_VERSION, self.index_offset, len(self.index)))
+        return ids
@@ -1,4 +1,64 @@
+import math
 import random
+import time
+
+
+# Deterministische Zeugen: für n < Schranke reichen die angegebenen Basen (Jaeschke, Sorenson/Webster)
+deterministic_witness_sets = [
+    (2_047, (2,)),
+    (1_373_653, (2, 3)),
+    (25_326_001, (2, 3, 5)),
+    (3_215_031_751, (2, 3, 5, 7)),
+    (2_152_302_898_747, (2, 3, 5, 7, 11)),
+    (3_474_749_660_383, (2, 3, 5, 7, 11, 13)),
+    (341_550_071_728_321, (2, 3, 5, 7, 11, 13, 17)),
+    (3_825_123_056_546_413_051, (2, 3, 5, 7, 11, 13, 17, 19, 23)),
+    (318_665_857_834_031_151_167_461, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)),
+    (3_317_044_064_679_887_385_961_981, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)),
+]
+DETERMINISTIC_LIMIT = deterministic_witness_sets[-1][0]
+
+small_primes = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97)
+small_primes_product = math.prod(small_primes)
+
+
+def decompose(n: int) -> tuple[int, int]:
+    """
+    Splits n - 1 into 2^r * d with odd d.
+
+    :param n: odd integer > 2
+    :return: (d, r)
+
+    >>> decompose(561)
+    (35, 4)
+    """
+    d = n - 1
+    r = 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+    return d, r
+
+
+def strong_probable_prime(n: int, a: int, d: int, r: int) -> bool:
+    """
+    One round of Miller-Rabin: checks if n is a strong probable prime to base a.
+
+    :param n: odd integer > 3
+    :param a: the witness
+    :param d: odd part of n - 1
+    :param r: n - 1 = 2^r * d
+    :return: False if a proves that n is composite
+    """
+    x = pow(a, d, n)
+    if x == 1 or x == n - 1:
+        return True
+
+    for _ in range(r - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
 
 
 def miller_rabin(n: int, k: int):
@@ -7,29 +67,216 @@ def miller_rabin(n: int, k: int):
 
     :param n: n odd integer to be tested for primality. n > 3
     :param k: the number of rounds of testing to perform
+
+    >>> miller_rabin(997, 20), miller_rabin(561, 20)
+    (True, False)
     """
-    d = n
-    r = 0
-    while d % 2 != 0:
-        d //= 2
-        r += 1
+    d, r = decompose(n)
 
     for _ in range(k):
         a = random.randint(2, n - 2)
-        x = pow(a, d, n)
+        if not strong_probable_prime(n, a, d, r):
+            return False
 
-        if x == 1 or x == n - 1:
-            continue
+    return True
 
-        break_out_of_outer_loop = False
-        for _ in range(r):
-            x = pow(x, 2, n)
-            if x == n - 1:
-                break_out_of_outer_loop = True
-                break
 
-        if break_out_of_outer_loop:
-            continue
+def jacobi(a: int, n: int) -> int:
+    """
+    Calculates the Jacobi symbol (a/n).
+
+    :param a: integer
+    :param n: odd positive integer
+    :return: -1, 0 or 1
+
+    >>> jacobi(5, 21), jacobi(2, 15), jacobi(3, 9)
+    (1, 1, 0)
+    """
+    a %= n
+    result = 1
+    while a != 0:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def strong_lucas_probable_prime(n: int) -> bool:
+    """
+    Strong Lucas probable prime test with Selfridge's parameters (method A).
+
+    :param n: odd integer > 2, not a perfect square
+    :return: False if n is composite
+    """
+    # D aus 5, -7, 9, -11, ... mit (D/n) = -1
+    D = 5
+    while True:
+        j = jacobi(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    P, Q = 1, (1 - D) // 4
+
+    # n + 1 = 2^s * d
+    d = n + 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    # U_d, V_d über die Bits von d (links nach rechts)
+    U, V, Qk = 1, P, Q % n
+    for bit in bin(d)[3:]:
+        U, V = U * V % n, (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if bit == "1":
+            U, V = P * U + V, D * U + P * V
+            U = (U + n if U % 2 else U) // 2 % n
+            V = (V + n if V % 2 else V) // 2 % n
+            Qk = Qk * Q % n
+
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        if V == 0:
+            return True
+        Qk = Qk * Qk % n
+    return False
+
+
+def baillie_psw(n: int) -> bool:
+    """
+    Baillie-PSW test: Miller-Rabin to base 2 and a strong Lucas test. No counterexample is known.
+
+    :param n: odd integer > 3
+    :return: True if n is (very likely) a prime
+
+    >>> baillie_psw(2**127 - 1), baillie_psw(3215031751), baillie_psw(2**128 + 1)
+    (True, False, False)
+    """
+    d, r = decompose(n)
+    if not strong_probable_prime(n, 2, d, r):
+        return False
+    if math.isqrt(n) ** 2 == n:
         return False
+    return strong_lucas_probable_prime(n)
 
-    return True
+
+def probable_prime(n: int, k: int = 20, method: str = "millerrabin") -> bool:
+    """
+    Primality test without trial division.
+    Below DETERMINISTIC_LIMIT fixed witness sets are used and the result is exact.
+
+    :param n: odd integer > 3
+    :param k: rounds of random Miller-Rabin for large n (method "millerrabin")
+    :param method: "millerrabin" or "bpsw" for n >= DETERMINISTIC_LIMIT
+    :return: True if n is a prime (large n: probably a prime)
+    """
+    if n < DETERMINISTIC_LIMIT:
+        d, r = decompose(n)
+        for limit, witnesses in deterministic_witness_sets:
+            if n < limit:
+                return all(strong_probable_prime(n, a, d, r) for a in witnesses if a % n != 0)
+
+    if method == "bpsw":
+        return baillie_psw(n)
+    return miller_rabin(n, k)
+
+
+def is_prime(n: int, k: int = 20, method: str = "millerrabin") -> bool:
+    """
+    Tests if n is a prime. Small n and numbers with small factors are handled without Miller-Rabin.
+
+    :param n: the number to test
+    :param k: rounds of random Miller-Rabin for n >= DETERMINISTIC_LIMIT
+    :param method: "millerrabin" or "bpsw" for n >= DETERMINISTIC_LIMIT
+    :return: True if n is a prime
+
+    >>> [n for n in range(60) if is_prime(n)]
+    [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59]
+    >>> sieve = [True] * 20000
+    >>> for i in range(2, 142):
+    ...     sieve[i * i::i] = [False] * len(range(i * i, 20000, i))
+    >>> all(is_prime(n) == sieve[n] for n in range(2, 20000))
+    True
+    >>> [is_prime(n) for n in (561, 3215031751, 341550071728321, 3825123056546413051)]  # Pseudoprimzahlen
+    [False, False, False, False]
+    >>> is_prime(2**89 - 1), is_prime(2**521 - 1, method="bpsw"), is_prime(2**523 - 1, method="bpsw")
+    (True, True, False)
+    """
+    if n < 2:
+        return False
+    if n <= small_primes[-1]:
+        return n in small_primes
+    if math.gcd(n, small_primes_product) != 1:
+        return False
+    return probable_prime(n, k, method)
+
+
+def is_prime_batch(candidates, k: int = 20, method: str = "millerrabin") -> list[bool]:
+    """
+    Tests many candidates. Small factors are rejected with one gcd against the product of
+    small_primes, the deterministic witness set is looked up once per bit length.
+
+    :param candidates: iterable of integers
+    :param k: rounds of random Miller-Rabin for n >= DETERMINISTIC_LIMIT
+    :param method: "millerrabin" or "bpsw" for n >= DETERMINISTIC_LIMIT
+    :return: list of booleans in the order of the candidates
+
+    >>> is_prime_batch([1, 2, 9, 97, 561, 7919, 2**61 - 1])
+    [False, True, False, True, False, True, True]
+    """
+    results = []
+    witnesses_for = {}  # (Bitlänge) -> Zeugen, damit die Tabelle nicht pro Kandidat durchsucht wird
+    for n in candidates:
+        if n <= small_primes[-1]:
+            results.append(n in small_primes)
+            continue
+        if math.gcd(n, small_primes_product) != 1:
+            results.append(False)
+            continue
+        if n >= DETERMINISTIC_LIMIT:
+            results.append(probable_prime(n, k, method))
+            continue
+
+        bits = n.bit_length()
+        witnesses = witnesses_for.get(bits)
+        if witnesses is None:
+            # alle n dieser Bitlänge liegen unter 2^bits
+            witnesses = next(w for limit, w in deterministic_witness_sets if (1 << bits) <= limit) \
+                if (1 << bits) <= DETERMINISTIC_LIMIT else None
+            witnesses_for[bits] = witnesses
+        if witnesses is None:
+            results.append(probable_prime(n, k, method))
+            continue
+
+        d, r = decompose(n)
+        results.append(all(strong_probable_prime(n, a, d, r) for a in witnesses))
+    return results
+
+
+if __name__ == "__main__":
+    # Durchsatz: zufällige ungerade Zahlen verschiedener Größen
+    for bits in (32, 64, 80, 256, 1024):
+        numbers = [random.getrandbits(bits) | 1 | (1 << (bits - 1)) for _ in range(2000)]
+        for name, test in [("miller_rabin k=20", lambda n: miller_rabin(n, 20)),
+                           ("is_prime", is_prime),
+                           ("is_prime bpsw", lambda n: is_prime(n, method="bpsw"))]:
+            start_time = time.perf_counter()
+            for n in numbers:
+                test(n)
+            taken_time = time.perf_counter() - start_time
+            print(f"{bits:>5} bits {name:>18}: {len(numbers) / taken_time:>10.0f} tests/s")
+
+        start_time = time.perf_counter()
+        is_prime_batch(numbers)
+        taken_time = time.perf_counter() - start_time
+        print(f"{bits:>5} bits {'is_prime_batch':>18}: {len(numbers) / taken_time:>10.0f} tests/s")
@@ -23,25 +23,302 @@ def pow_iterative(a: int, b: int, n: int = None):
     return result
 
 
-if __name__ == "__main__":
+def default_window_size(b: int) -> int:
+    """
+    Returns a window size that minimizes the number of multiplications for the exponent b.
+
+    :param b: Exponent
+    :return: window size in bits
+    """
+    bits = b.bit_length()
+    if bits <= 24:
+        return 1
+    if bits <= 80:
+        return 3
+    if bits <= 240:
+        return 4
+    if bits <= 672:
+        return 5
+    return 6
+
+
+def pow_fixed_window(a: int, b: int, n: int, window: int = 4):
+    """
+    Left-to-right k-ary exponentiation: the exponent is processed in fixed groups of window bits,
+    the powers a^0 .. a^(2^window - 1) are precomputed.
+
+    :param a: Base
+    :param b: Exponent
+    :param n: Modulus
+    :param window: Number of bits per group
+    :return: a**b % n
+
+    >>> pow_fixed_window(312222, 1384184120, 490291) == pow(312222, 1384184120, 490291)
+    True
+    """
+    table = [1 % n, a % n]
+    for _ in range(2, 1 << window):
+        table.append(table[-1] * a % n)
+
+    mask = (1 << window) - 1
+    shift = (b.bit_length() + window - 1) // window * window
+    result = 1 % n
+    while shift > 0:
+        shift -= window
+        for _ in range(window):
+            result = result * result % n
+        digit = (b >> shift) & mask
+        if digit:
+            result = result * table[digit] % n
+    return result
+
+
+def pow_sliding_window(a: int, b: int, n: int, window: int = None):
+    """
+    Left-to-right sliding window exponentiation: runs of zero bits are squared over,
+    windows always end with a 1 bit, so only odd powers of a have to be precomputed.
+
+    :param a: Base
+    :param b: Exponent
+    :param n: Modulus
+    :param window: Maximal window size in bits (default: depends on the size of b)
+    :return: a**b % n
+
+    >>> all(pow_sliding_window(a, b, 1009) == pow(a, b, 1009) for a in range(20) for b in range(300))
+    True
+    """
+    if window is None:
+        window = default_window_size(b)
+
+    # ungerade Potenzen a^1, a^3, ..., a^(2^window - 1)
+    a %= n
+    a_squared = a * a % n
+    odd_powers = [a]
+    for _ in range(1, 1 << (window - 1)):
+        odd_powers.append(odd_powers[-1] * a_squared % n)
+
+    result = 1 % n
+    i = b.bit_length() - 1
+    while i >= 0:
+        if not (b >> i) & 1:
+            result = result * result % n
+            i -= 1
+            continue
+
+        # längstes Fenster b[i..j] mit höchstens window Bits, das mit einer 1 endet
+        j = max(i - window + 1, 0)
+        while not (b >> j) & 1:
+            j += 1
+        value = (b >> j) & ((1 << (i - j + 1)) - 1)
+        for _ in range(i - j + 1):
+            result = result * result % n
+        result = result * odd_powers[value >> 1] % n
+        i = j - 1
+    return result
+
+
+class Montgomery:
+    """
+    Montgomery arithmetic for an odd modulus n: numbers are kept as x * R mod n with R = 2^k > n,
+    the reduction after a multiplication only needs shifts, masks and multiplications.
+    """
+
+    def __init__(self, n: int):
+        if n % 2 == 0 or n < 3:
+            raise ValueError("Montgomery reduction needs an odd modulus > 1")
+        self.n = n
+        self.bits = n.bit_length()
+        self.mask = (1 << self.bits) - 1
+        self.r2 = (1 << (2 * self.bits)) % n           # R^2 mod n, für die Umrechnung in die Montgomery-Form
+        self.n_prime = (-pow(n, -1, 1 << self.bits)) & self.mask  # -n^-1 mod R
+
+    def reduce(self, t: int) -> int:
+        """Calculates t * R^-1 mod n for 0 <= t < n * R (REDC)."""
+        m = ((t & self.mask) * self.n_prime) & self.mask
+        t = (t + m * self.n) >> self.bits
+        return t - self.n if t >= self.n else t
+
+    def to_montgomery(self, x: int) -> int:
+        return self.reduce((x % self.n) * self.r2)
+
+    def from_montgomery(self, x: int) -> int:
+        return self.reduce(x)
+
+    def pow(self, a: int, b: int, window: int = None) -> int:
+        """
+        Sliding window exponentiation with Montgomery multiplication.
+
+        :param a: Base
+        :param b: Exponent
+        :param window: Maximal window size in bits (default: depends on the size of b)
+        :return: a**b % n
+
+        >>> Montgomery(490291).pow(312222, 1384184120) == pow(312222, 1384184120, 490291)
+        True
+        >>> Montgomery(2**127 - 1).pow(3, 2**127 - 2)
+        1
+        """
+        if window is None:
+            window = default_window_size(b)
+        reduce = self.reduce
+
+        a_mont = self.to_montgomery(a)
+        a_squared = reduce(a_mont * a_mont)
+        odd_powers = [a_mont]
+        for _ in range(1, 1 << (window - 1)):
+            odd_powers.append(reduce(odd_powers[-1] * a_squared))
+
+        result = self.to_montgomery(1)
+        i = b.bit_length() - 1
+        while i >= 0:
+            if not (b >> i) & 1:
+                result = reduce(result * result)
+                i -= 1
+                continue
+
+            j = max(i - window + 1, 0)
+            while not (b >> j) & 1:
+                j += 1
+            value = (b >> j) & ((1 << (i - j + 1)) - 1)
+            for _ in range(i - j + 1):
+                result = reduce(result * result)
+            result = reduce(result * odd_powers[value >> 1])
+            i = j - 1
+        return self.from_montgomery(result)
+
+
+def pow_montgomery(a: int, b: int, n: int, window: int = None):
+    """
+    Calculates a**b % n in Montgomery form (n has to be odd).
+
+    :param a: Base
+    :param b: Exponent
+    :param n: Modulus (odd)
+    :param window: Maximal window size in bits
+    :return: a**b % n
+    """
+    return Montgomery(n).pow(a, b, window)
+
+
+class FixedBase:
+    """
+    Precomputed table for repeated exponentiation of the same base:
+    table[i][j] = a^(j * 2^(window * i)) mod n, an exponentiation then needs no squarings
+    and at most one multiplication per window of the exponent.
+    """
+
+    def __init__(self, a: int, n: int, max_exponent_bits: int, window: int = 4):
+        self.n = n
+        self.window = window
+        self.table = []
+
+        base = a % n
+        for _ in range((max_exponent_bits + window - 1) // window):
+            row = [1 % n, base]
+            for _ in range(2, 1 << window):
+                row.append(row[-1] * base % n)
+            self.table.append(row)
+            base = row[-1] * base % n  # a^(2^window * 2^(window * i))
+
+    def pow(self, b: int) -> int:
+        """
+        Calculates a**b % n with the precomputed table.
+
+        :param b: Exponent (at most max_exponent_bits bits)
+        :return: a**b % n
+
+        >>> fixed = FixedBase(5, 1000003, 64)
+        >>> all(fixed.pow(b) == pow(5, b, 1000003) for b in (0, 1, 2, 12345, 2**64 - 1))
+        True
+        """
+        if b.bit_length() > len(self.table) * self.window:
+            raise ValueError("exponent is larger than the precomputed table")
+        n = self.n
+        mask = (1 << self.window) - 1
+        result = 1 % n
+        for row in self.table:
+            if not b:
+                break
+            digit = b & mask
+            if digit:
+                result = result * row[digit] % n
+            b >>= self.window
+        return result
+
+
+def benchmark(sizes: list[int], repeats: int = 20) -> list[dict]:
+    """
+    Measures all exponentiation variants against the builtin pow.
+    Base, exponent and (odd) modulus have the given number of bits.
+
+    :param sizes: operand sizes in bits
+    :param repeats: exponentiations per variant and size
+    :return: list of rows {"bits", "variant", "ms", "relative_to_builtin"}
+    """
+    import random
     import time
-    loop_times = 5000
 
-    start_time = time.time()
-    for i in range(loop_times):
-        x_1 = pow_iterative(2, 10, 1000)
-        x_2 = pow_iterative(11000, 12310, 23)
-        x_3 = pow_iterative(312222, 1384184120, 490291)
-    end_time = time.time() - start_time
+    rows = []
+    for bits in sizes:
+        n = random.getrandbits(bits) | (1 << (bits - 1)) | 1
+        operands = [(random.randrange(n), random.getrandbits(bits) | (1 << (bits - 1))) for _ in range(repeats)]
+        montgomery = Montgomery(n)
+        fixed_base = FixedBase(operands[0][0], n, bits)
+
+        variants = {
+            "builtin": lambda a, b: pow(a, b, n),
+            "iterative": lambda a, b: pow_iterative(a, b, n),
+            "fixed_window": lambda a, b: pow_fixed_window(a, b, n),
+            "sliding_window": lambda a, b: pow_sliding_window(a, b, n),
+            "montgomery": lambda a, b: montgomery.pow(a, b),
+            "fixed_base": lambda a, b: fixed_base.pow(b),  # immer dieselbe Basis
+        }
 
-    print("pow_iterative: {", x_1, x_2, x_3, "} time taken:", end_time*1000, "ms")
+        expected = [pow(a, b, n) for a, b in operands]
+        builtin_time = None
+        for name, function in variants.items():
+            start_time = time.perf_counter()
+            results = [function(a, b) for a, b in operands]
+            taken_time = (time.perf_counter() - start_time) / repeats * 1000
 
-    start_time = time.time()
-    for i in range(loop_times):
-        x_1 = pow(2, 10, 1000)
-        x_2 = pow(11000, 12310, 23)
-        x_3 = pow(312222, 1384184120, 490291)
-    end_time = time.time() - start_time
+            if name == "fixed_base":
+                assert results == [pow(operands[0][0], b, n) for _, b in operands]
+            else:
+                assert results == expected, name
+            if builtin_time is None:
+                builtin_time = taken_time
+            rows.append({"bits": bits, "variant": name, "ms": taken_time,
+                         "relative_to_builtin": taken_time / builtin_time})
+    return rows
+
+
+def save_results(rows: list[dict], filename: str):
+    """
+    Saves benchmark rows as CSV.
+
+    :param rows: rows returned by benchmark
+    :param filename: the name of the output file
+    """
+    import csv
+
+    with open(filename, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["bits", "variant", "ms", "relative_to_builtin"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    import argparse
 
-    print("pow: {", x_1, x_2, x_3, "} time taken:", end_time*1000, "ms")
+    parser = argparse.ArgumentParser(description="Benchmark of the modular exponentiation variants.")
+    parser.add_argument("-s", "--sizes", type=int, nargs="+", default=[64, 256, 1024, 2048],
+                        help="Operand sizes in bits (default: 64 256 1024 2048)")
+    parser.add_argument("-r", "--repeats", type=int, default=20, help="Exponentiations per measurement (default: 20)")
+    parser.add_argument("-o", "--output", default="pow_benchmark.csv", help="CSV output file (default: pow_benchmark.csv)")
+    args = parser.parse_args()
 
+    rows = benchmark(args.sizes, args.repeats)
+    for row in rows:
+        print(f"{row['bits']:>6} bits {row['variant']:>15}: {row['ms']:>10.3f} ms ({row['relative_to_builtin']:.2f}x builtin)")
+    save_results(rows, args.output)
+    print("Results saved as", args.output)
@@ -1,12 +1,14 @@
 __author__ = "Luka Pacar"
 
 import random
+import time
+from collections import Counter
 
 from UE00_RSA import millerrabin
 
 
 def is_prim_millerrabin(n):
-    return millerrabin.miller_rabin(n, 20)
+    return millerrabin.probable_prime(n, 20)
 
 
 primes_100 = [
@@ -27,29 +29,137 @@ def is_prim(n):
     """
     Tests if the given number is a prime
     :param n: The number to test.
-    :return: if the number is a prime. ((1/4)^20 chance to be wrong)
+    :return: if the number is a prime. (exact below 3.3*10^24, otherwise (1/4)^20 chance to be wrong)
     """
-    for prime in primes_100:
-        if n % prime == 0:
-            return False
-    return is_prim_millerrabin(n)
+    return millerrabin.is_prime(n, 20)
 
-def generate_prime(bits):
+
+def small_primes(limit: int) -> list[int]:
     """
-    Generates a prime with a certain number of bits.
+    Calculates all primes below limit (sieve of Eratosthenes).
+    :param limit: upper bound (exclusive)
+    :return: list of primes < limit
+
+    >>> small_primes(20)
+    [2, 3, 5, 7, 11, 13, 17, 19]
+    """
+    sieve = bytearray([1]) * limit
+    sieve[:2] = b"\x00\x00"
+    for i in range(2, int(limit ** 0.5) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit, i)))
+    return [i for i, is_prime in enumerate(sieve) if is_prime]
+
+
+# Sieb-Tabelle für die inkrementelle Suche (einmal beim Import berechnet)
+SIEVE_LIMIT = 1 << 15
+sieve_primes = small_primes(SIEVE_LIMIT)[1:]  # ohne 2, Kandidaten sind ungerade
+
+# Anzahl der ungeraden Kandidaten start, start + 2, ... die pro Startwert gesiebt werden
+SIEVE_WINDOW = 1 << 15
+
+
+def generate_prime_trial(bits, stats: Counter = None):
+    """
+    Generates a prime by testing random odd candidates with trial division and Miller-Rabin.
     :param bits: number of bits.
+    :param stats: optional Counter, receives the number of "candidates" and "millerrabin" tests
     :return: a prime number with the amount of given bits.
     """
-    assert bits >= 2
     while True:
         candidate = random.getrandbits(bits)
         candidate |= (1 << (bits - 1)) # no 0s in front
         candidate |= 1 # uneven
 
-        if is_prim(candidate):
+        if stats is not None:
+            stats["candidates"] += 1
+        if candidate > primes_100[-1] and any(candidate % prime == 0 for prime in primes_100):
+            continue
+        if stats is not None:
+            stats["millerrabin"] += 1
+        if is_prim_millerrabin(candidate):
             return candidate
 
+
+def generate_prime_sieve(bits, stats: Counter = None):
+    """
+    Generates a prime with incremental search over start, start + 2, ..., start + 2 * (SIEVE_WINDOW - 1).
+    The residue of the random start value is computed once per sieve prime, from it follows
+    the first candidate divisible by that prime and every prime-th candidate after it is crossed out.
+    Only the remaining candidates are tested with Miller-Rabin, no candidate is divided again.
+    :param bits: number of bits.
+    :param stats: optional Counter, receives the number of "candidates" and "millerrabin" tests
+    :return: a prime number with the amount of given bits.
+    """
+    if bits <= SIEVE_LIMIT.bit_length():  # Kandidat könnte selbst eine Sieb-Primzahl sein
+        return generate_prime_trial(bits, stats)
+
+    upper_bound = 1 << bits
+    while True:
+        start = random.getrandbits(bits) | (1 << (bits - 1)) | 1
+        window = min(SIEVE_WINDOW, (upper_bound - start + 1) // 2)
+
+        candidates = bytearray([1]) * window
+        for prime in sieve_primes:
+            # start + 2k = 0 (mod prime)  <=>  k = -start * 2^-1 (mod prime)
+            first = (prime - start % prime) * ((prime + 1) // 2) % prime
+            candidates[first::prime] = bytes(len(range(first, window, prime)))
+
+        offset = candidates.find(1)
+        while offset != -1:
+            if stats is not None:
+                stats["millerrabin"] += 1
+            if is_prim_millerrabin(start + 2 * offset):
+                if stats is not None:
+                    stats["candidates"] += offset + 1
+                return start + 2 * offset
+            offset = candidates.find(1, offset + 1)
+
+        if stats is not None:
+            stats["candidates"] += window
+
+
+prime_strategies = {
+    "trial": generate_prime_trial,
+    "sieve": generate_prime_sieve,
+}
+
+
+def generate_prime(bits, strategy: str = "sieve", stats: Counter = None):
+    """
+    Generates a prime with a certain number of bits.
+    :param bits: number of bits.
+    :param strategy: the candidate search to use ("trial" or "sieve")
+    :param stats: optional Counter, receives the number of "candidates" and "millerrabin" tests
+    :return: a prime number with the amount of given bits.
+
+    >>> all(generate_prime(bits, strategy).bit_length() == bits for bits in (2, 8, 16, 64, 256) for strategy in prime_strategies)
+    True
+    """
+    assert bits >= 2
+    return prime_strategies[strategy](bits, stats)
+
+
+def benchmark_strategies(bits: int, count: int = 5):
+    """
+    Prints the candidates tested per second and the time per prime for each strategy.
+    :param bits: number of bits of the generated primes.
+    :param count: number of primes to generate per strategy.
+    """
+    for strategy in prime_strategies:
+        stats = Counter()
+        start_time = time.perf_counter()
+        for _ in range(count):
+            generate_prime(bits, strategy, stats)
+        taken_time = time.perf_counter() - start_time
+        print(f"{strategy:>6}: {bits} bits -> {stats['candidates'] / taken_time:.0f} candidates/s, "
+              f"{stats['millerrabin'] / count:.1f} Miller-Rabin tests/prime, {taken_time / count * 1000:.1f} ms/prime")
+
+
 if __name__ == "__main__":
     print(generate_prime(10))
     print(generate_prime(100))
-    print(generate_prime(10000))
\ No newline at end of file
+    print(generate_prime(10000))
+
+    for bits in (512, 1024, 2048):
+        benchmark_strategies(bits)
@@ -1,12 +1,22 @@
 __author__ = "Luka Pacar"
 
 import argparse
+import hashlib
+import hmac
 import logging
 import math
+import mmap
+import multiprocessing
+import os
+import random
 import secrets
+import struct
 import sys
-from typing import Tuple, Literal
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple, Literal, Iterator
 
+from keystore import Keyring, encode_key, decode_key, is_binary_key
 from prime import generate_prime
 
 
@@ -23,20 +33,24 @@ def generate_e(phi: int) -> int:
     return e
 
 
-def generate_keys(number_of_bits: int) -> Tuple[Tuple[int, int, int], Tuple[int, int, int]]:
+def generate_keys(number_of_bits: int) -> Tuple[Tuple[int, int, int], Tuple[int, ...]]:
     """
     Generate RSA key pair.
 
+    The private key additionally carries the CRT fields p, q, dP, dQ and qInv,
+    which allow decryption with two half-width exponentiations.
+
     :param number_of_bits: Approximate key size in bits.
-    :return: (public_key, private_key) tuples with e/d, n, key_len.
+    :return: (public_key, private_key) tuples with e/d, n, key_len (+ p, q, dP, dQ, qInv for the private key).
 
     >>> pub, priv = generate_keys(32)  # small key for testing
     >>> e, n, _ = pub
-    >>> d, _, _ = priv
+    >>> d, _, _, p, q, dp, dq, q_inv = priv
     >>> for x in [0, 1, 42, 123]:
     ...     c = pow(x, e, n)
     ...     y = pow(c, d, n)
     ...     assert x == y
+    ...     assert crt_pow(c, p, q, dp, dq, q_inv) == y
 
     """
     half = int(number_of_bits / 2)
@@ -44,6 +58,17 @@ def generate_keys(number_of_bits: int) -> Tuple[Tuple[int, int, int], Tuple[int,
     while q == p:
         q = generate_prime(half)
 
+    return keys_from_primes(p, q)
+
+
+def keys_from_primes(p: int, q: int) -> Tuple[Tuple[int, int, int], Tuple[int, ...]]:
+    """
+    Build an RSA key pair from two distinct primes.
+
+    :param p: first prime
+    :param q: second prime
+    :return: (public_key, private_key) like generate_keys
+    """
     n = p * q
     phi = (p - 1) * (q - 1)
 
@@ -52,10 +77,123 @@ def generate_keys(number_of_bits: int) -> Tuple[Tuple[int, int, int], Tuple[int,
 
     key_len = n.bit_length()
     public = (e, n, key_len)
-    private = (d, n, key_len)
+    private = (d, n, key_len, p, q, d % (p - 1), d % (q - 1), pow(q, -1, p))
     return public, private
 
 
+def _prime_worker(bits: int, primes: multiprocessing.Queue):
+    """Searches primes with the given number of bits forever and puts them into the queue."""
+    random.seed()  # nach fork hätten sonst alle Prozesse denselben Zufallszustand
+    while True:
+        primes.put(generate_prime(bits))
+
+
+def generate_primes_parallel(bits: int, count: int, workers: int) -> list[int]:
+    """
+    Searches distinct primes on a pool of processes.
+    The workers are terminated as soon as count distinct primes were found.
+
+    :param bits: number of bits of each prime
+    :param count: number of distinct primes to find
+    :param workers: number of worker processes
+    :return: list of count distinct primes
+    """
+    queue = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_prime_worker, args=(bits, queue), daemon=True) for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    try:
+        primes = {}  # dict statt set, damit die Reihenfolge erhalten bleibt
+        while len(primes) < count:
+            primes[queue.get()] = None
+        return list(primes)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+        queue.close()
+
+
+def generate_keys_parallel(number_of_bits: int, workers: int) -> Tuple[Tuple[int, int, int], Tuple[int, ...]]:
+    """
+    Generate RSA key pair, p and q are searched concurrently.
+
+    :param number_of_bits: Approximate key size in bits.
+    :param workers: number of worker processes
+    :return: (public_key, private_key) like generate_keys
+    """
+    p, q = generate_primes_parallel(int(number_of_bits / 2), 2, workers)
+    return keys_from_primes(p, q)
+
+
+def generate_key_pairs(number_of_bits: int, count: int, workers: int = 1) -> list[Tuple[Tuple[int, int, int], Tuple[int, ...]]]:
+    """
+    Generates many key pairs from distinct primes.
+
+    :param number_of_bits: Approximate key size in bits.
+    :param count: number of key pairs
+    :param workers: number of worker processes
+    :return: list of (public_key, private_key)
+    """
+    half = int(number_of_bits / 2)
+    if workers > 1:
+        primes = generate_primes_parallel(half, 2 * count, workers)
+    else:
+        primes = []
+        while len(primes) < 2 * count:
+            prime = generate_prime(half)
+            if prime not in primes:
+                primes.append(prime)
+
+    return [keys_from_primes(primes[2 * i], primes[2 * i + 1]) for i in range(count)]
+
+
+def generate_key_batch(number_of_bits: int, count: int, directory: str, workers: int = 1,
+                       binary: bool = False) -> list[Tuple[str, str]]:
+    """
+    Generates many key pairs and saves them as NNNN_public.key/NNNN_private.key in the given directory.
+
+    :param number_of_bits: Approximate key size in bits.
+    :param count: number of key pairs
+    :param directory: output directory (created if missing)
+    :param workers: number of worker processes
+    :param binary: save the keys as binary containers
+    :return: list of (public_key_file, private_key_file)
+    """
+    os.makedirs(directory, exist_ok=True)
+    files = []
+    for i, (public, private) in enumerate(generate_key_pairs(number_of_bits, count, workers)):
+        public_file = os.path.join(directory, f"{i:04d}_public.key")
+        private_file = os.path.join(directory, f"{i:04d}_private.key")
+        save_key(public_file, public, binary)
+        save_key(private_file, private, binary)
+        files.append((public_file, private_file))
+    return files
+
+
+def crt_pow(c: int, p: int, q: int, dp: int, dq: int, q_inv: int) -> int:
+    """
+    Calculates c^d mod p*q using the Chinese Remainder Theorem (Garner's formula).
+
+    :param c: ciphertext block
+    :param p: first prime of the modulus
+    :param q: second prime of the modulus
+    :param dp: d mod (p - 1)
+    :param dq: d mod (q - 1)
+    :param q_inv: q^-1 mod p
+    :return: c^d mod p*q
+
+    >>> crt_pow(pow(42, 7, 55), 11, 5, 3, 3, 9)  # d = 23
+    42
+    """
+    m1 = pow(c % p, dp, p)
+    m2 = pow(c % q, dq, q)
+    h = (q_inv * (m1 - m2)) % p
+    return m2 + h * q
+
+
 def file2ints(filename, block_size: int = 4, byte_order: Literal["little", "big"] = "big"):
     """
     Read a binary file and yield integer values of its byte blocks.
@@ -74,59 +212,331 @@ def file2ints(filename, block_size: int = 4, byte_order: Literal["little", "big"
             yield int.from_bytes(block, byte_order)
 
 
-def save_key(filename: str, key: Tuple[int, int, int]):
+DEFAULT_CHUNK_SIZE = 1 << 20  # 1 MiB pro Lesezugriff
+
+
+def file2chunks(filename, block_size: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Read a binary file in large buffered chunks that always contain whole blocks.
+
+    :param filename: Path to the binary file
+    :param block_size: Number of bytes per block
+    :param chunk_size: Approximate number of bytes per chunk (rounded down to a multiple of block_size)
+    :yield: Chunks of bytes; only the last chunk may end with a partial block
+    """
+    chunk_size = max(block_size, chunk_size - chunk_size % block_size)
+    with open(filename, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def transform_chunk(chunk: bytes, key: Tuple[int, ...], input_block_size: int, output_block_size: int) -> bytes:
+    """
+    Split a chunk into blocks and apply c = m^exponent mod n to every block.
+    Private keys with CRT fields are applied with crt_pow.
+
+    :param chunk: Bytes of one chunk (a multiple of input_block_size, except for the last chunk)
+    :param key: Key tuple (e|d, n, key_len) or private key with CRT fields
+    :param input_block_size: Number of bytes per input block
+    :param output_block_size: Number of bytes per output block
+    :return: The transformed blocks concatenated
+
+    >>> transform_chunk(bytes([2, 3]), (3, 1000, 10), 1, 2)
+    b'\\x00\\x08\\x00\\x1b'
+    >>> transform_chunk(bytes([17]), (23, 55, 6, 11, 5, 3, 3, 9), 1, 1)
+    b'\\x12'
+    """
+    from_bytes = int.from_bytes
+    apply_key = block_function(key)
+    blocks = (from_bytes(chunk[i:i + input_block_size], "big") for i in range(0, len(chunk), input_block_size))
+    return b"".join(apply_key(block).to_bytes(output_block_size, "big") for block in blocks)
+
+
+def block_function(key: Tuple[int, ...]):
+    """
+    Returns the function that applies the key to one block (pow or crt_pow for private keys with CRT fields).
+
+    :param key: Key tuple (e|d, n, key_len) or private key with CRT fields
+    :return: function block -> block^exponent mod n
+    """
+    if len(key) > 3:
+        _, _, _, p, q, dp, dq, q_inv = key
+        return lambda block: crt_pow(block, p, q, dp, dq, q_inv)
+    exponent, n = key[0], key[1]
+    return lambda block: pow(block, exponent, n)
+
+
+def transform_file(input_file: str, output_file: str, key: Tuple[int, ...],
+                   input_block_size: int, output_block_size: int,
+                   workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Stream a file through the RSA block transformation.
+
+    Chunks are read with one syscall each and, if workers > 1, handed to a process pool.
+    At most 2 * workers chunks are in flight, results are written in input order.
+
+    :param input_file: Path to the input file
+    :param output_file: Path to the output file
+    :param key: Key tuple, see transform_chunk
+    :param input_block_size: Number of bytes per input block
+    :param output_block_size: Number of bytes per output block
+    :param workers: Number of worker processes (1 = serial)
+    :param chunk_size: Number of bytes to read at once
+    """
+    chunks = file2chunks(input_file, input_block_size, chunk_size)
+    with open(output_file, "wb") as f_out:
+        if workers <= 1:
+            for chunk in chunks:
+                f_out.write(transform_chunk(chunk, key, input_block_size, output_block_size))
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(transform_chunk, chunk, key, input_block_size, output_block_size))
+                if len(pending) >= 2 * workers:
+                    f_out.write(pending.popleft().result())
+            while pending:
+                f_out.write(pending.popleft().result())
+
+
+def transform_file_mmap(input_file: str, output_file: str, key: Tuple[int, ...],
+                        input_block_size: int, output_block_size: int, flush_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Same output as transform_file, but the input is memory-mapped and blocks are sliced through a memoryview
+    without copying. The output file is preallocated (number of blocks * output_block_size) and written
+    through a second mapping. Every flush_size bytes of output the finished pages of both mappings are
+    written back and released, so the resident memory does not grow with the file size.
+
+    :param input_file: Path to the input file
+    :param output_file: Path to the output file
+    :param key: Key tuple, see transform_chunk
+    :param input_block_size: Number of bytes per input block
+    :param output_block_size: Number of bytes per output block
+    :param flush_size: Number of output bytes between write-backs
+    """
+    input_size = os.path.getsize(input_file)
+    blocks = -(-input_size // input_block_size)
+    output_size = blocks * output_block_size
+
+    with open(output_file, "w+b") as f_out:
+        f_out.truncate(output_size)
+        if blocks == 0:  # leere Dateien können nicht gemappt werden
+            return
+
+        with open(input_file, "rb") as f_in, \
+                mmap.mmap(f_in.fileno(), 0, access=mmap.ACCESS_READ) as source, \
+                mmap.mmap(f_out.fileno(), output_size) as target, \
+                memoryview(source) as view:
+            from_bytes = int.from_bytes
+            apply_key = block_function(key)
+            blocks_per_flush = max(1, flush_size // output_block_size)
+            released_in = released_out = 0
+
+            for i in range(blocks):
+                block = apply_key(from_bytes(view[i * input_block_size:(i + 1) * input_block_size], "big"))
+                target[i * output_block_size:(i + 1) * output_block_size] = block.to_bytes(output_block_size, "big")
+
+                if (i + 1) % blocks_per_flush == 0 and hasattr(mmap, "MADV_DONTNEED"):
+                    # fertige, seitenausgerichtete Bereiche zurückschreiben und freigeben
+                    done_out = (i + 1) * output_block_size // mmap.PAGESIZE * mmap.PAGESIZE
+                    done_in = (i + 1) * input_block_size // mmap.PAGESIZE * mmap.PAGESIZE
+                    if done_out > released_out:
+                        target.flush(released_out, done_out - released_out)
+                        target.madvise(mmap.MADV_DONTNEED, released_out, done_out - released_out)
+                        released_out = done_out
+                    if done_in > released_in:
+                        source.madvise(mmap.MADV_DONTNEED, released_in, done_in - released_in)
+                        released_in = done_in
+            target.flush()
+
+
+def save_key(filename: str, key: Tuple[int, ...], binary: bool = False):
     """
     Exports a key to a file.
     :param filename: the name of the output file
-    :param key: The key to Export ((e|d),n,key_len)
+    :param key: The key to Export ((e|d),n,key_len) - private keys may append p,q,dP,dQ,qInv
+    :param binary: write the binary container (keystore.encode_key) instead of decimal text
     """
+    if binary:
+        with open(filename, "wb") as f:
+            f.write(encode_key(key))
+        return
+
     with open(filename, "w") as f:
         f.write(" ".join(map(str, key)))
 
 
 def load_key(filename: str) -> Tuple[int, ...]:
-    """Load a key from a file."""
+    """Load a key from a text or binary file. Accepts the short (3 fields) and the CRT (8 fields) format."""
+    if is_binary_key(filename):
+        with open(filename, "rb") as f:
+            return decode_key(f.read())
+
     with open(filename, "r") as f:
         parts = tuple(map(int, f.read().split()))
         return parts
 
 
-def encrypt_file(input_file: str, output_file: str, key: Tuple[int, int, int]):
+def encrypt_file(input_file: str, output_file: str, key: Tuple[int, int, int],
+                 workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE, use_mmap: bool = False):
     """
     Encrypt a binary file with RSA.
 
     :param input_file: Path to plaintext file
     :param output_file: Path to ciphertext file
     :param key: Public key tuple (e, n, key_len)
+    :param workers: Number of worker processes (1 = serial)
+    :param chunk_size: Number of bytes to read at once
+    :param use_mmap: use the memory-mapped serial path (transform_file_mmap)
     """
     e, n, key_len = key
     input_block_size = (n.bit_length() - 1) // 8
     output_block_size = (n.bit_length() // 8) + 1
 
-    with open(output_file, "wb") as f_out:
-        for m in file2ints(input_file, input_block_size, "big"):
-            c = pow(m, e, n)
-            c_bytes = c.to_bytes(output_block_size, byteorder="big")
-            f_out.write(c_bytes)
+    if use_mmap:
+        transform_file_mmap(input_file, output_file, key, input_block_size, output_block_size, chunk_size)
+        return
+    transform_file(input_file, output_file, key, input_block_size, output_block_size, workers, chunk_size)
 
 
-def decrypt_file(input_file: str, output_file: str, key: Tuple[int, int, int]):
+def decrypt_file(input_file: str, output_file: str, key: Tuple[int, ...],
+                 workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE, use_mmap: bool = False):
     """
     Decrypt a binary file encrypted with RSA in binary mode.
 
     :param input_file: Path to the ciphertext file
     :param output_file: Path to the recovered plaintext file
-    :param key: Private key tuple (d, n, key_len)
+    :param key: Private key tuple (d, n, key_len) - uses CRT if (p, q, dP, dQ, qInv) follow
+    :param workers: Number of worker processes (1 = serial)
+    :param chunk_size: Number of bytes to read at once
+    :param use_mmap: use the memory-mapped serial path (transform_file_mmap)
     """
-    d, n, key_len = key
+    d, n, key_len = key[:3]
     input_block_size = (n.bit_length() // 8) + 1
     output_block_size = (n.bit_length() - 1) // 8
 
+    if use_mmap:
+        transform_file_mmap(input_file, output_file, key, input_block_size, output_block_size, chunk_size)
+        return
+    transform_file(input_file, output_file, key, input_block_size, output_block_size, workers, chunk_size)
+
+
+# Hybrid-Container: Header, RSA-verschlüsselter Zufallswert, Nonce, Nutzdaten (Stromchiffre), HMAC-SHA256
+HYBRID_MAGIC = b"RSAH"
+HYBRID_HEADER = struct.Struct(">4sBxxxII")  # Magic, Version, Länge des RSA-Blocks, Chunk-Größe
+HYBRID_VERSION = 1
+HYBRID_NONCE_SIZE = 16
+HYBRID_TAG_SIZE = 32
+
+
+def derive_session_keys(secret: int) -> Tuple[bytes, bytes]:
+    """
+    Derives the stream key and the MAC key from the RSA-wrapped random value (RSA-KEM).
+
+    :param secret: random value 0 < secret < n
+    :return: (stream_key, mac_key)
+    """
+    data = secret.to_bytes((secret.bit_length() + 7) // 8, "big")
+    return hashlib.sha256(b"stream" + data).digest(), hashlib.sha256(b"mac" + data).digest()
+
+
+def xor_keystream(chunk: bytes, stream_key: bytes, nonce: bytes, counter: int) -> bytes:
+    """
+    XORs a chunk with the SHAKE-256 keystream of (stream_key, nonce, counter).
+    Encryption and decryption are the same operation.
+
+    :param chunk: the data
+    :param stream_key: 32 byte key
+    :param nonce: the nonce of the container
+    :param counter: the index of the chunk
+    :return: the transformed chunk
+
+    >>> xor_keystream(xor_keystream(b"RSA", bytes(32), bytes(16), 0), bytes(32), bytes(16), 0)
+    b'RSA'
+    """
+    keystream = hashlib.shake_256(stream_key + nonce + counter.to_bytes(8, "big")).digest(len(chunk))
+    return (int.from_bytes(chunk, "little") ^ int.from_bytes(keystream, "little")).to_bytes(len(chunk), "little")
+
+
+def hybrid_encrypt_file(input_file: str, output_file: str, key: Tuple[int, int, int],
+                        chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Encrypt a file in the hybrid container: RSA encrypts one random value, the keys derived from it
+    encrypt the payload chunk by chunk with a stream cipher and authenticate it with HMAC-SHA256.
+    The ciphertext is exactly header + RSA block + nonce + tag larger than the plaintext.
+
+    :param input_file: Path to plaintext file
+    :param output_file: Path to ciphertext file
+    :param key: Public key tuple (e, n, key_len)
+    :param chunk_size: Number of bytes to read at once
+    """
+    e, n = key[0], key[1]
+    chunk_size = max(1, chunk_size)  # wie file2chunks mit block_size 1, der Header enthält die echte Größe
+    wrapped_size = (n.bit_length() // 8) + 1
+    secret = secrets.randbelow(n - 2) + 2
+    stream_key, mac_key = derive_session_keys(secret)
+    nonce = secrets.token_bytes(HYBRID_NONCE_SIZE)
+
+    header = (HYBRID_HEADER.pack(HYBRID_MAGIC, HYBRID_VERSION, wrapped_size, chunk_size)
+              + pow(secret, e, n).to_bytes(wrapped_size, "big") + nonce)
+    mac = hmac.new(mac_key, header, hashlib.sha256)
     with open(output_file, "wb") as f_out:
-        for c in file2ints(input_file, input_block_size, "big"):
-            m = pow(c, d, n)
-            print(m)
-            f_out.write(m.to_bytes(20, "big"))
+        f_out.write(header)
+        for counter, chunk in enumerate(file2chunks(input_file, 1, chunk_size)):
+            encrypted = xor_keystream(chunk, stream_key, nonce, counter)
+            mac.update(encrypted)
+            f_out.write(encrypted)
+        f_out.write(mac.digest())
+
+
+def hybrid_decrypt_file(input_file: str, output_file: str, key: Tuple[int, ...]):
+    """
+    Decrypt a hybrid container created by hybrid_encrypt_file.
+    If the header is invalid or the HMAC does not match, a ValueError is raised (and the output file is removed).
+
+    :param input_file: Path to the ciphertext file
+    :param output_file: Path to the recovered plaintext file
+    :param key: Private key tuple (d, n, key_len) - uses CRT if (p, q, dP, dQ, qInv) follow
+    """
+    d, n = key[0], key[1]
+    payload_size = os.path.getsize(input_file)
+    with open(input_file, "rb") as f_in:
+        header = f_in.read(HYBRID_HEADER.size)
+        if len(header) < HYBRID_HEADER.size:
+            raise ValueError(f"{input_file} is not a hybrid RSA container")
+        magic, version, wrapped_size, chunk_size = HYBRID_HEADER.unpack(header)
+        if magic != HYBRID_MAGIC or version != HYBRID_VERSION:
+            raise ValueError(f"{input_file} is not a hybrid RSA container")
+        # Header prüfen, bevor gelesen wird: chunk_size 0 würde nie weiterlesen
+        if chunk_size <= 0 or wrapped_size != (n.bit_length() // 8) + 1 \
+                or HYBRID_HEADER.size + wrapped_size + HYBRID_NONCE_SIZE + HYBRID_TAG_SIZE > payload_size:
+            raise ValueError(f"{input_file}: invalid hybrid header (chunk size {chunk_size}, RSA block {wrapped_size} bytes)")
+        header += f_in.read(wrapped_size + HYBRID_NONCE_SIZE)
+        payload_size -= len(header) + HYBRID_TAG_SIZE
+
+        wrapped = int.from_bytes(header[HYBRID_HEADER.size:HYBRID_HEADER.size + wrapped_size], "big")
+        secret = crt_pow(wrapped, *key[3:]) if len(key) > 3 else pow(wrapped, d, n)
+        stream_key, mac_key = derive_session_keys(secret)
+        nonce = header[-HYBRID_NONCE_SIZE:]
+        mac = hmac.new(mac_key, header, hashlib.sha256)
+
+        with open(output_file, "wb") as f_out:
+            counter = 0
+            while payload_size > 0:
+                chunk = f_in.read(min(chunk_size, payload_size))
+                payload_size -= len(chunk)
+                mac.update(chunk)
+                f_out.write(xor_keystream(chunk, stream_key, nonce, counter))
+                counter += 1
+        tag = f_in.read(HYBRID_TAG_SIZE)
+
+    if not hmac.compare_digest(tag, mac.digest()):
+        os.remove(output_file)
+        raise ValueError(f"{input_file}: authentication failed (wrong key or modified file)")
 
 
 if __name__ == "__main__":
@@ -146,36 +556,105 @@ if __name__ == "__main__":
 
     # Key handling
     parser.add_argument("-k", "--key", metavar="KEYFILE",
-                        help="Specify key file to use (default: local private.key/public.key files)")
-
+                        help="Specify key file to use (default: local private.key/public.key files), "
+                             "with --keyring the key id (fingerprint prefix)")
+    parser.add_argument("--keyring", metavar="FILE",
+                        help="Keyring file: -g adds the new keys, -e/-d load the key given by -k from it")
+    parser.add_argument("--binary", action="store_true", help="Save generated keys in the binary key format")
+    parser.add_argument("--server", metavar="SOCKET",
+                        help="Decrypt through a running rsa_server.py daemon listening on SOCKET (block mode)")
+    parser.add_argument("--hybrid", action="store_true",
+                        help="Encrypt/decrypt with the hybrid container (RSA-wrapped session key + stream cipher)")
+
+
+    # Key generation
+    parser.add_argument("-n", "--count", type=int, default=1,
+                        help="Number of key pairs to generate with -g (default: 1)")
+    parser.add_argument("--directory", metavar="DIR",
+                        help="Output directory for -g, keys are saved as NNNN_public.key/NNNN_private.key")
 
     # Input/output
     parser.add_argument("-i", "--input", metavar="FILE", help="Input file")
     parser.add_argument("-o", "--output", metavar="FILE", help="Output file")
 
+    # Performance
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="Number of worker processes for key generation/encryption/decryption (default: 1)")
+    parser.add_argument("--mmap", action="store_true",
+                        help="Use memory-mapped input/output for block mode encryption/decryption (serial)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, metavar="BYTES",
+                        help=f"Number of bytes read per chunk (default: {DEFAULT_CHUNK_SIZE})")
+
     args = parser.parse_args()
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size must be positive")
+    if args.keyring and (args.encrypt or args.decrypt) and not args.key:
+        parser.error("--keyring with -e/-d requires the key id (fingerprint prefix) with -k")
+    if args.server and (args.hybrid or args.keyring):
+        parser.error("--server only decrypts block mode ciphertexts with a key file, not with --hybrid or --keyring")
 
     logging.basicConfig(level=getattr(logging, args.loglevel))
 
-    if args.keygen:
-        public, private = generate_keys(args.keygen)
+    if args.keygen and args.keyring:
+        keys = []
+        for public, private in generate_key_pairs(args.keygen, args.count, args.workers):
+            keys += [(public, False), (private, True)]
+        ids = Keyring(args.keyring).add(keys)
+        logging.info(f"Generated {args.count} RSA key pairs of length {args.keygen} bits")
+        print(f"Keys added to {args.keyring}: {', '.join(ids[::2])}")
+
+    elif args.keygen and (args.directory or args.count > 1):
+        directory = args.directory if args.directory else "."
+        files = generate_key_batch(args.keygen, args.count, directory, args.workers, args.binary)
+        logging.info(f"Generated {len(files)} RSA key pairs of length {args.keygen} bits")
+        print(f"{len(files)} key pairs saved in {directory}")
+
+    elif args.keygen:
+        if args.workers > 1:
+            public, private = generate_keys_parallel(args.keygen, args.workers)
+        else:
+            public, private = generate_keys(args.keygen)
         logging.info(f"Generated RSA keys of length {args.keygen}d bits")
-        save_key("public.key", public)
-        save_key("private.key", private)
+        save_key("public.key", public, args.binary)
+        save_key("private.key", private, args.binary)
         print("Keys saved as public.key and private.key")
 
     elif args.encrypt:
-        keyfile = args.key if args.key else "public.key"
-        key = load_key(keyfile)
+        if args.keyring:
+            key = Keyring(args.keyring).get(args.key, private=False)
+        else:
+            keyfile = args.key if args.key else "public.key"
+            key = load_key(keyfile)
         infile = args.input if args.input else args.encrypt
         outfile = args.output if args.output else infile + ".enc"
-        encrypt_file(infile, outfile, key)
+        if args.hybrid:
+            hybrid_encrypt_file(infile, outfile, key, args.chunk_size)
+        else:
+            encrypt_file(infile, outfile, key, args.workers, args.chunk_size, args.mmap)
         print(f"Encrypted {infile} → {outfile}")
 
-    elif args.decrypt:
+    elif args.decrypt and args.server:
+        from rsa_server import DecryptionClient  # erst hier, rsa_server importiert rsa
+
         keyfile = args.key if args.key else "private.key"
-        key = load_key(keyfile)
         infile = args.input if args.input else args.decrypt
         outfile = args.output if args.output else infile + ".dec"
-        decrypt_file(infile, outfile, key)
+        client = DecryptionClient(args.server)
+        with open(infile, "rb") as f_in, open(outfile, "wb") as f_out:
+            f_out.write(client.decrypt(keyfile, f_in.read()))
+        client.close()
+        print(f"Decrypted {infile} → {outfile}")
+
+    elif args.decrypt:
+        if args.keyring:
+            key = Keyring(args.keyring).get(args.key, private=True)
+        else:
+            keyfile = args.key if args.key else "private.key"
+            key = load_key(keyfile)
+        infile = args.input if args.input else args.decrypt
+        outfile = args.output if args.output else infile + ".dec"
+        if args.hybrid:
+            hybrid_decrypt_file(infile, outfile, key)
+        else:
+            decrypt_file(infile, outfile, key, args.workers, args.chunk_size, args.mmap)
         print(f"Decrypted {infile} → {outfile}")
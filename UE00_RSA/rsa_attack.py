@@ -2,35 +2,543 @@ __author__ = "Luka Pacar"
 
 import math
 import argparse
+import os
+import time
 
-def fermat_factor(N):
+try:
+    from gmpy2 import mpz  # GMP dividiert große Zahlen subquadratisch
+    HAVE_GMPY2 = True
+except ImportError:  # optional, ohne gmpy2 rechnet batch_gcd mit int und Barrett-Reduktion
+    mpz = int
+    HAVE_GMPY2 = False
+
+from keystore import decode_key, is_binary_key
+
+try:
+    import millerrabin  # als Skript aus UE00_RSA/ gestartet
+except ImportError:
+    from UE00_RSA import millerrabin
+
+# Module für den quadratischen-Rest-Filter bei Fermat (paarweise teilerfremd)
+FERMAT_FILTER_MODULI = (16, 9, 5, 7, 11, 13)
+
+# Standardbudget pro Methode, damit factor() bei schweren N nicht endlos rechnet
+DEFAULT_ITERATIONS = 10_000_000
+
+
+class BudgetExhausted(RuntimeError):
+    """No factoring method found a factor and at least one of them stopped because its budget was used up."""
+
+
+class Budget:
+    """
+    Iteration and time limit for one factoring method, also prints progress if verbose.
+    """
+
+    def __init__(self, name: str, max_iterations: int = None, seconds: float = None, verbose: bool = False):
+        self.name = name
+        self.max_iterations = max_iterations
+        self.seconds = seconds
+        self.verbose = verbose
+        self.iterations = 0
+        self.exhausted = False
+        self.start_time = time.perf_counter()
+        self.next_report = self.start_time + 1
+
+    def step(self, iterations: int = 1) -> bool:
+        """
+        Counts iterations.
+        :return: False if the budget is used up
+        """
+        self.iterations += iterations
+        if self.max_iterations is not None and self.iterations >= self.max_iterations:
+            self.exhausted = True
+            return False
+        if self.seconds is None and not self.verbose:
+            return True
+
+        now = time.perf_counter()
+        if self.verbose and now >= self.next_report:
+            print(f"[{self.name}] {self.iterations} iterations, {now - self.start_time:.1f}s")
+            self.next_report = now + 1
+        self.exhausted = self.seconds is not None and now - self.start_time >= self.seconds
+        return not self.exhausted
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start_time
+
+
+def trial_division(N, limit: int = 1_000_000, budget: Budget = None):
+    """
+    Factor a number by dividing through 2, 3 and all 6k +- 1 up to limit.
+
+    :param N: integer to factor
+    :param limit: largest divisor to try
+    :param budget: optional iteration/time budget
+    :return: tuple of factors (p, q) or None
+
+    >>> trial_division(91)
+    (7, 13)
+    """
+    for p in (2, 3):
+        if N % p == 0 and N != p:
+            return p, N // p
+
+    limit = min(limit, math.isqrt(N))
+    p = 5
+    while p <= limit:
+        if N % p == 0:
+            return p, N // p
+        if N % (p + 2) == 0 and p + 2 <= limit:
+            return p + 2, N // (p + 2)
+        if budget is not None and not budget.step():
+            return None
+        p += 6
+    return None
+
+
+def fermat_filter(N, moduli=FERMAT_FILTER_MODULI) -> tuple[int, list[int]]:
+    """
+    Calculates the residues a mod M (M = product of moduli) for which a^2 - N can be a square
+    modulo every m in moduli. All other a can be skipped without calculating isqrt.
+
+    :param N: integer to factor
+    :param moduli: pairwise coprime moduli
+    :return: (M, sorted allowed residues of a mod M)
+    """
+    M = 1
+    allowed = [0]
+    for m in moduli:
+        squares = {x * x % m for x in range(m)}
+        valid = [(a * a - N) % m in squares for a in range(m)]
+        # Reste mod M*m, die mod M erlaubt waren und mod m erlaubt sind (chinesischer Restsatz)
+        allowed = [a + k * M for k in range(m) for a in allowed if valid[(a + k * M) % m]]
+        M *= m
+    return M, sorted(allowed)
+
+
+def fermat_factor(N, budget: Budget = None):
     """
     Factor a number using Fermat's method.
+    Candidates a whose a^2 - N is no square modulo the FERMAT_FILTER_MODULI are skipped.
 
     :param N: integer to factor
-    :return: tuple of factors (p, q)
+    :param budget: optional iteration/time budget
+    :return: tuple of factors (p, q) or None
+
+    >>> fermat_factor(5959)
+    (59, 101)
+    >>> fermat_factor(1000003 * 1000033)
+    (1000003, 1000033)
     """
+    if N % 2 == 0:
+        return (2, N // 2) if N > 2 else None
     a = math.isqrt(N)
-    if a * a < N:
-        a += 1
+    if a * a == N:
+        return a, a
+    a += 1
+
+    M, residues = fermat_filter(N)
+    base = a - a % M
+    index = next((i for i, r in enumerate(residues) if base + r >= a), len(residues))
 
     count = 0
     while True:
+        if index == len(residues):
+            base += M
+            index = 0
+        a = base + residues[index]
+        index += 1
+
         b2 = a*a - N
         b = math.isqrt(b2)
         count += 1
         if b*b == b2:
             p = a - b
             q = a + b
+            if p == 1:  # N ist eine Primzahl
+                return None
+            if budget is not None and budget.verbose:
+                print(f"[fermat] found after {count} square roots (a = {a})")
             return p, q
-        a += 1
+        if budget is not None and not budget.step():
+            return None
+
+
+def pollard_rho_brent(N, budget: Budget = None, seed: int = 2, c: int = 1):
+    """
+    Factor a number using Pollard's rho with Brent's cycle detection,
+    gcds are accumulated in batches of 128 products.
+
+    :param N: integer to factor
+    :param budget: optional iteration/time budget
+    :param seed: start value x0
+    :param c: constant of f(x) = x^2 + c
+    :return: tuple of factors (p, q) or None
+
+    >>> sorted(pollard_rho_brent(10403 * 1000003))
+    [10403, 1000003]
+    """
+    if N % 2 == 0:
+        return (2, N // 2) if N > 2 else None
+
+    batch = 128
+    while c < N:
+        y, r, q, g = seed, 1, 1, 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % N
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(batch, r - k)):
+                    y = (y * y + c) % N
+                    q = q * abs(x - y) % N
+                g = math.gcd(q, N)
+                k += batch
+                if budget is not None and not budget.step(batch):
+                    return None
+            r *= 2
+
+        if g == N:  # Produkt enthielt beide Faktoren -> einzeln wiederholen
+            while True:
+                ys = (ys * ys + c) % N
+                g = math.gcd(abs(x - ys), N)
+                if g > 1:
+                    break
+        if g != N:
+            return g, N // g
+        c += 1  # anderes Polynom versuchen
+    return None
+
+
+def pollard_p_minus_1(N, bound: int = 1_000_000, budget: Budget = None):
+    """
+    Factor a number using Pollard's p-1 method: finds p if p - 1 is bound-smooth.
+
+    :param N: integer to factor
+    :param bound: smoothness bound B
+    :param budget: optional iteration/time budget
+    :return: tuple of factors (p, q) or None
+
+    >>> pollard_p_minus_1(1009 * 1000003, bound=100)  # 1008 = 2^4 * 3^2 * 7
+    (1009, 1000003)
+    """
+    if N % 2 == 0:
+        return (2, N // 2) if N > 2 else None
+
+    sieve = bytearray([1]) * (bound + 1)
+    a = 2
+    primes = 0
+    for p in range(2, bound + 1):
+        if not sieve[p]:
+            continue
+        sieve[p * p::p] = bytes(len(range(p * p, bound + 1, p)))
+
+        pk = p
+        while pk * p <= bound:
+            pk *= p
+        a = pow(a, pk, N)
+
+        primes += 1
+        if primes % 100 == 0:  # gcd nur alle 100 Primzahlen
+            g = math.gcd(a - 1, N)
+            if g == N:
+                return None
+            if g > 1:
+                return g, N // g
+        if budget is not None and not budget.step():
+            break
+
+    g = math.gcd(a - 1, N)
+    if 1 < g < N:
+        return g, N // g
+    return None
+
+
+METHODS = {
+    "trial": lambda N, budget: trial_division(N, budget=budget),
+    "fermat": fermat_factor,
+    "rho": pollard_rho_brent,
+    "pm1": lambda N, budget: pollard_p_minus_1(N, budget=budget),
+}
+
+
+def factor(N, methods=tuple(METHODS), max_iterations: int = DEFAULT_ITERATIONS, seconds: float = None,
+           verbose: bool = False):
+    """
+    Tries the factoring methods in order of cost until one succeeds.
+    Primes are recognized with Miller-Rabin before any method runs.
+
+    :param N: integer to factor
+    :param methods: names of the methods in the order to try (see METHODS)
+    :param max_iterations: iteration budget per method (None = unlimited)
+    :param seconds: time budget per method (None = unlimited)
+    :param verbose: print progress
+    :return: (p, q, method), or None if N is a prime or no method finds a factor within its limits
+    :raises BudgetExhausted: if no factor was found and a method ran out of its budget
+
+    >>> factor(1000003 * 1000033, max_iterations=100_000)
+    (1000003, 1000033, 'fermat')
+    >>> factor(2 ** 127 - 1) is None
+    True
+    >>> factor(100000000000000000039 * 30000000000000000000000067, max_iterations=1000)
+    Traceback (most recent call last):
+    ...
+    rsa_attack.BudgetExhausted: no factor found, budget exhausted for trial, fermat, rho, pm1
+    """
+    if N < 4 or millerrabin.is_prime(N):
+        return None
+
+    exhausted = []
+    for name in methods:
+        budget = Budget(name, max_iterations, seconds, verbose)
+        result = METHODS[name](N, budget)
+        if verbose:
+            status = "success" if result else "budget exhausted" if budget.exhausted else "no factor"
+            print(f"[{name}] {status} after {budget.iterations} iterations, {budget.elapsed():.3f}s")
+        if result:
+            p, q = sorted(result)
+            return p, q, name
+        if budget.exhausted:
+            exhausted.append(name)
+    if exhausted:
+        raise BudgetExhausted(f"no factor found, budget exhausted for {', '.join(exhausted)}")
+    return None
+
+
+def product_tree(numbers: list) -> list[list]:
+    """
+    Builds a product tree: level 0 are the numbers, every level above holds the products of pairs.
+
+    :param numbers: the leaves
+    :return: list of levels, the last level contains only the product of all numbers
+
+    >>> product_tree([2, 3, 5])
+    [[2, 3, 5], [6, 5], [30]]
+    """
+    tree = [list(numbers)]
+    while len(tree[-1]) > 1:
+        level = tree[-1]
+        tree.append([level[i] * level[i + 1] if i + 1 < len(level) else level[i] for i in range(0, len(level), 2)])
+    return tree
+
+
+# ab dieser Bitlänge rechnet mod_square mit Multiplikationen (Karatsuba) statt mit der eingebauten Division
+BARRETT_THRESHOLD = 200_000
+
+
+def reciprocal(m: int) -> int:
+    """
+    Calculates floor(4^k / m) with k = bit length of m by Newton iteration,
+    so only multiplications are needed (Python ints divide quadratically, but multiply with Karatsuba).
+
+    :param m: positive integer
+    :return: floor(4^k / m)
+
+    >>> m = 3 ** 200000
+    >>> reciprocal(m) == (1 << 2 * m.bit_length()) // m
+    True
+    """
+    k = m.bit_length()
+    if k <= BARRETT_THRESHOLD:
+        return (1 << 2 * k) // m
+
+    shift = k - (k // 2 + 1)
+    x = reciprocal(m >> shift) << shift  # obere Hälfte, etwa k/2 korrekte Bits
+    x += (x * ((1 << 2 * k) - m * x)) >> (2 * k)  # Newton-Schritt verdoppelt die korrekten Bits
+    rest = (1 << 2 * k) - m * x
+    while rest < 0:
+        x -= 1
+        rest += m
+    while rest >= m:
+        x += 1
+        rest -= m
+    return x
+
+
+def mod_square(value, node):
+    """
+    Calculates value mod node² for value < node⁴ (parent and child in a remainder tree).
+    Without gmpy2 large values are reduced with Barrett reduction.
+
+    :param value: the number to reduce
+    :param node: the node of the product tree
+    :return: value mod node²
+
+    >>> n = 7 ** 80000
+    >>> mod_square(n ** 3 + 12345, n) == (n ** 3 + 12345) % (n * n)
+    True
+    """
+    m = node * node
+    k = m.bit_length()
+    # die eingebaute Division kostet Länge des Quotienten * Länge von m, bei kleinem Quotienten ist sie schneller
+    if HAVE_GMPY2 or value.bit_length() - k <= BARRETT_THRESHOLD or value.bit_length() > 2 * k:
+        return value % m
+
+    q = ((value >> (k - 1)) * reciprocal(m)) >> (k + 1)
+    rest = value - q * m
+    while rest >= m:
+        rest -= m
+    return rest
+
+
+def remainder_tree(value, tree: list[list]) -> list:
+    """
+    Reduces value down a product tree: every node gets the remainder of its parent modulo node².
+
+    :param value: the number to reduce (usually the product at the root)
+    :param tree: product tree as returned by product_tree
+    :return: value mod leaf² for every leaf
+
+    >>> remainder_tree(30, product_tree([2, 3, 5]))
+    [2, 3, 5]
+    """
+    remainders = [mod_square(value, tree[-1][0])]
+    for level in reversed(tree[:-1]):
+        remainders = [mod_square(remainders[i // 2], node) for i, node in enumerate(level)]
+    return remainders
+
+
+def batch_gcd(moduli: list[int], group_size: int = 4096, verbose: bool = False) -> list[int]:
+    """
+    Calculates gcd(N_i, product of all other N_j) for every modulus with a product/remainder tree (Bernstein).
+    The moduli are split into groups: a remainder tree over the group products gives every group
+    P mod G², only the tree of one group is kept in memory at a time.
+
+    Only with gmpy2 (pip install gmpy2, see HAVE_GMPY2) the big divisions are fast enough for a
+    quasi-linear run time. Without it Python ints with Barrett reduction (mod_square) are used,
+    which is still superlinear and only practical for a few thousand moduli.
+
+    :param moduli: distinct RSA moduli
+    :param group_size: number of moduli per remainder tree
+    :param verbose: print progress
+    :return: list of gcds (1 = no shared factor, N_i = all factors shared)
+
+    >>> batch_gcd([7 * 11, 13 * 17, 11 * 19, 23 * 29], group_size=2)
+    [11, 1, 11, 1]
+    >>> batch_gcd([7 * 11, 13 * 17, 11 * 19, 23 * 29, 7 * 31], group_size=2)
+    [77, 1, 11, 1, 7]
+    """
+    groups = [[mpz(n) for n in moduli[i:i + group_size]] for i in range(0, len(moduli), group_size)]
+    group_products = [product_tree(group)[-1][0] for group in groups]
+    upper_tree = product_tree(group_products)
+    # P mod G_i² für jede Gruppe aus dem Elternknoten statt aus dem Gesamtprodukt
+    group_remainders = remainder_tree(upper_tree[-1][0], upper_tree)
+    del upper_tree
+
+    gcds = []
+    for index, (group, remainder) in enumerate(zip(groups, group_remainders)):
+        remainders = remainder_tree(remainder, product_tree(group))
+        gcds.extend(int(math.gcd(int(r // n), int(n))) for r, n in zip(remainders, group))
+        if verbose:
+            print(f"[batch-gcd] group {index + 1}/{len(groups)} done")
+    return gcds
+
+
+def load_moduli(path: str) -> dict[int, list[str]]:
+    """
+    Loads moduli from a directory of key files (saved by rsa.save_key as text or binary, n is the second number)
+    or from a text file with one modulus or key per line.
+
+    :param path: directory or file
+    :return: modulus -> names of the keys that use it
+    """
+    if os.path.isdir(path):
+        sources = []
+        for name in sorted(os.listdir(path)):
+            filename = os.path.join(path, name)
+            if is_binary_key(filename):
+                with open(filename, "rb") as f:
+                    sources.append((name, " ".join(map(str, decode_key(f.read())))))
+                continue
+            with open(filename) as f:
+                sources.append((name, f.read()))
+    else:
+        with open(path) as f:
+            sources = [(f"{path}:{i}", line) for i, line in enumerate(f, 1)]
+
+    moduli = {}
+    for name, text in sources:
+        numbers = text.split()
+        if not numbers:
+            continue
+        n = int(numbers[1] if len(numbers) > 1 else numbers[0])
+        moduli.setdefault(n, []).append(name)
+    return moduli
+
+
+def find_shared_factors(moduli: list[int], group_size: int = 4096, verbose: bool = False) -> dict[int, tuple[int, int]]:
+    """
+    Finds all moduli that share a prime factor with another modulus.
+
+    :param moduli: distinct RSA moduli
+    :param group_size: number of moduli per remainder tree
+    :param verbose: print progress
+    :return: compromised modulus -> (p, q)
+
+    >>> find_shared_factors([7 * 11, 13 * 17, 11 * 19, 7 * 19])
+    {77: (7, 11), 209: (11, 19), 133: (7, 19)}
+    """
+    gcds = batch_gcd(moduli, group_size, verbose)
+    found = {}
+    both_shared = []
+    for n, g in zip(moduli, gcds):
+        if g == n:
+            both_shared.append(n)
+        elif g > 1:
+            found[n] = tuple(sorted((g, n // g)))
+
+    # beide Faktoren mit anderen Moduln geteilt -> paarweise gcd gegen alle betroffenen Moduln
+    candidates = both_shared + list(found)
+    for n in both_shared:
+        for other in candidates:
+            g = math.gcd(n, other)
+            if other != n and 1 < g < n:
+                found[n] = tuple(sorted((g, n // g)))
+                break
+    return found
+
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Fermat attack on RSA")
-    parser.add_argument("modul", type=int, help="RSA modulus N")
+    parser = argparse.ArgumentParser(description="Factoring attack on RSA")
+    parser.add_argument("modul", type=int, nargs="?", help="RSA modulus N")
+    parser.add_argument("-b", "--batch", metavar="PATH",
+                        help="Batch-GCD over all moduli in a directory of key files or a file with one modulus per line")
+    parser.add_argument("--group-size", type=int, default=4096,
+                        help="Moduli per remainder tree in batch mode (default: 4096)")
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
+    parser.add_argument("-m", "--methods", nargs="+", choices=list(METHODS), default=list(METHODS),
+                        help="Methods in the order to try (default: trial fermat rho pm1)")
+    parser.add_argument("-t", "--time", type=float, default=None, metavar="SECONDS",
+                        help="Time budget per method in seconds")
+    parser.add_argument("-n", "--iterations", type=int, default=DEFAULT_ITERATIONS,
+                        help=f"Iteration budget per method (default: {DEFAULT_ITERATIONS})")
     args = parser.parse_args()
 
-    p, q = fermat_factor(args.modul)
-    print(f"p -> {p}")
-    print(f"q -> {q}")
+    if args.batch:
+        if not HAVE_GMPY2:
+            print("gmpy2 not installed, using Python ints (only practical for a few thousand moduli, pip install gmpy2)")
+        moduli = load_moduli(args.batch)
+        start_time = time.perf_counter()
+        compromised = find_shared_factors(list(moduli), args.group_size, args.verbose)
+        print(f"{len(compromised)} of {len(moduli)} moduli compromised ({time.perf_counter() - start_time:.1f}s)")
+        for n, (p, q) in compromised.items():
+            print(f"{', '.join(moduli[n])}: p -> {p}, q -> {q}")
+    elif args.modul is None:
+        parser.error("either a modulus or --batch is required")
+    else:
+        try:
+            result = factor(args.modul, args.methods, args.iterations, args.time, args.verbose)
+        except BudgetExhausted as error:
+            print(f"No factor found: {error}")
+            raise SystemExit(1)
+        if result is None:
+            print("No factor found (prime or no method applies)")
+        else:
+            p, q, method = result
+            print(f"p -> {p}")
+            print(f"q -> {q}")
+            if args.verbose:
+                print(f"method -> {method}")
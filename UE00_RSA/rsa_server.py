@@ -0,0 +1,237 @@
+__author__ = "Luka Pacar"
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import struct
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Tuple
+
+from rsa import load_key, transform_chunk
+
+# Anfrage: Länge des Schlüsselpfads, Länge der Nutzdaten, danach Pfad und Chiffretext (Blockmodus)
+REQUEST_HEADER = struct.Struct(">HI")
+# Antwort: Status (0 = ok), Länge, danach Klartext oder Fehlermeldung
+RESPONSE_HEADER = struct.Struct(">BI")
+
+DEFAULT_SOCKET = "rsa.sock"
+
+
+def decrypt_blocks(key: Tuple[int, ...], payloads: list[bytes]) -> list[bytes]:
+    """
+    Decrypts several ciphertexts (block mode, see rsa.decrypt_file) with the same key in one worker call.
+
+    :param key: Private key tuple, CRT fields are used if present
+    :param payloads: the ciphertexts
+    :return: the plaintexts in the same order
+    """
+    n = key[1]
+    input_block_size = (n.bit_length() // 8) + 1
+    output_block_size = (n.bit_length() - 1) // 8
+    return [transform_chunk(payload, key, input_block_size, output_block_size) for payload in payloads]
+
+
+def reset_signals():
+    """
+    Initializer of the worker processes: forked workers inherit the signal handlers and the wakeup fd
+    of the event loop, a SIGTERM to a worker would otherwise stop the server.
+    """
+    signal.set_wakeup_fd(-1)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class DecryptionServer:
+    """
+    Local decryption daemon: keeps parsed private keys in an LRU cache and collects concurrent
+    requests into batches per key, which are decrypted on a process pool.
+    Only key files inside key_directory are opened.
+    """
+
+    def __init__(self, workers: int = 1, cache_size: int = 64, batch_size: int = 32, batch_delay: float = 0.002,
+                 key_directory: str = "."):
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=reset_signals)
+        self.key_directory = os.path.realpath(key_directory)
+        self.keys: OrderedDict[str, tuple[float, Tuple[int, ...]]] = OrderedDict()  # Pfad -> (mtime, Schlüssel)
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.queue: asyncio.Queue = None
+
+    def get_key(self, path: str) -> Tuple[int, ...]:
+        """
+        Returns the parsed key, the file is only read again if it was modified.
+
+        :param path: path of the private key file (must lie inside key_directory)
+        :return: the key tuple
+        """
+        path = os.path.realpath(path)
+        if os.path.commonpath([path, self.key_directory]) != self.key_directory:
+            raise PermissionError(f"{path} is outside of the key directory")
+        mtime = os.path.getmtime(path)
+        cached = self.keys.get(path)
+        if cached is not None and cached[0] == mtime:
+            self.keys.move_to_end(path)
+            return cached[1]
+
+        key = load_key(path)
+        self.keys[path] = (mtime, key)
+        self.keys.move_to_end(path)
+        if len(self.keys) > self.cache_size:
+            self.keys.popitem(last=False)
+        return key
+
+    async def batcher(self):
+        """Takes requests from the queue, waits batch_delay for more and decrypts them grouped by key."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            if self.batch_delay > 0:
+                await asyncio.sleep(self.batch_delay)
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            groups: dict[str, list] = {}
+            for request in batch:
+                groups.setdefault(request[0], []).append(request)
+            for path, requests in groups.items():
+                key = requests[0][1]
+                pool = self.pool
+                try:
+                    task = loop.run_in_executor(pool, decrypt_blocks, key, [payload for _, _, payload, _ in requests])
+                except Exception as error:  # z.B. BrokenProcessPool: Batch scheitert, der Batcher läuft weiter
+                    self.fail(requests, error, pool)
+                    continue
+                task.add_done_callback(lambda done, requests=requests, pool=pool: self.resolve(done, requests, pool))
+
+    def fail(self, requests: list, error: BaseException, pool: ProcessPoolExecutor):
+        """Fails the waiting connections of one batch, a broken pool is replaced once for the next batches."""
+        logging.warning(f"batch of {len(requests)} requests failed: {error!r}")
+        for *_, future in requests:
+            if not future.done():
+                future.set_exception(error)
+        if isinstance(error, BrokenProcessPool) and pool is self.pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=reset_signals)
+
+    def resolve(self, done: asyncio.Future, requests: list, pool: ProcessPoolExecutor):
+        """Hands the results of one batch to the waiting connections."""
+        if done.cancelled():
+            self.fail(requests, RuntimeError("batch was cancelled"), pool)
+            return
+        if done.exception() is not None:
+            self.fail(requests, done.exception(), pool)
+            return
+        for (*_, future), plaintext in zip(requests, done.result()):
+            if not future.done():
+                future.set_result(plaintext)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answers requests of one connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(REQUEST_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+                path_length, payload_length = REQUEST_HEADER.unpack(header)
+                path = (await reader.readexactly(path_length)).decode()
+                payload = await reader.readexactly(payload_length)
+
+                try:
+                    future = asyncio.get_running_loop().create_future()
+                    await self.queue.put((path, self.get_key(path), payload, future))
+                    response = (0, await future)
+                except Exception as error:  # Fehler an den Client melden, Server läuft weiter
+                    logging.warning(f"request for {path} failed: {error}")
+                    response = (1, str(error).encode())
+                writer.write(RESPONSE_HEADER.pack(response[0], len(response[1])) + response[1])
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path: str):
+        """Runs the server on a Unix socket until it is cancelled or gets SIGTERM/SIGINT."""
+        self.queue = asyncio.Queue()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        loop = asyncio.get_running_loop()
+        main = asyncio.current_task()
+        for signal_number in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signal_number, main.cancel)  # Abbruch statt Prozessende, damit finally läuft
+        server = await asyncio.start_unix_server(self.handle, path=socket_path)
+        batcher = asyncio.create_task(self.batcher())
+        logging.info(f"listening on {socket_path}, keys from {self.key_directory}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self.pool.shutdown(cancel_futures=True)
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+
+
+class DecryptionClient:
+    """Blocking client for the DecryptionServer, one connection can send many requests."""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(socket_path)
+
+    def _read_exactly(self, length: int) -> bytes:
+        data = bytearray()
+        while len(data) < length:
+            part = self.socket.recv(length - len(data))
+            if not part:
+                raise ConnectionError("server closed the connection")
+            data += part
+        return bytes(data)
+
+    def decrypt(self, key_file: str, ciphertext: bytes) -> bytes:
+        """
+        Lets the server decrypt a ciphertext (block mode).
+
+        :param key_file: path of the private key file (resolved to an absolute path for the server)
+        :param ciphertext: the ciphertext
+        :return: the plaintext
+        """
+        path = os.path.abspath(key_file).encode()
+        self.socket.sendall(REQUEST_HEADER.pack(len(path), len(ciphertext)) + path + ciphertext)
+        status, length = RESPONSE_HEADER.unpack(self._read_exactly(RESPONSE_HEADER.size))
+        data = self._read_exactly(length)
+        if status != 0:
+            raise RuntimeError(f"server error: {data.decode()}")
+        return data
+
+    def close(self):
+        self.socket.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local RSA decryption daemon.")
+    parser.add_argument("-s", "--socket", default=DEFAULT_SOCKET, help=f"Unix socket path (default: {DEFAULT_SOCKET})")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("-k", "--key-dir", default=".",
+                        help="Directory of the private keys, other paths are refused (default: current directory)")
+    parser.add_argument("--cache-size", type=int, default=64, help="Number of cached keys (default: 64)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Maximal requests per batch (default: 32)")
+    parser.add_argument("--batch-delay", type=float, default=0.002,
+                        help="Seconds to wait for more requests of a batch (default: 0.002)")
+    parser.add_argument("-l", "--loglevel", default="INFO",
+                        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+                        help="Set the logging level (default: INFO)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, args.loglevel))
+    server = DecryptionServer(args.workers, args.cache_size, args.batch_size, args.batch_delay, args.key_dir)
+    try:
+        asyncio.run(server.serve(args.socket))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
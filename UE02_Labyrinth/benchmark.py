@@ -0,0 +1,130 @@
+__author__ = "Luka Pacar"
+
+import argparse
+import csv
+import json
+import os
+import statistics
+import time
+
+from generator import generate_maze, generators
+from labyrinth import Maze, search, search_algorithms, to_map, pos_directions, traverse_breadth_first_search, \
+    traverse_depth_first_search
+
+
+def benchmark_search(mazes: dict[str, Maze], repeats: int = 3) -> list[tuple[str, str, int, int, float]]:
+    """
+    Runs every algorithm of search_algorithms on every map.
+
+    :param mazes: name -> compiled map
+    :param repeats: runs per algorithm and map, the fastest one counts
+    :return: list of (map, algorithm, path_length, expanded_cells, ms)
+    """
+    results = []
+    for name, maze in mazes.items():
+        for algorithm in search_algorithms:
+            best_time = None
+            for _ in range(repeats):
+                start_time = time.perf_counter()
+                result = search(maze, algorithm)
+                taken_time = time.perf_counter() - start_time
+                best_time = taken_time if best_time is None else min(best_time, taken_time)
+            results.append((name, algorithm, len(result.path), result.expanded, best_time * 1000))
+    return results
+
+
+def solvers() -> dict:
+    """
+    All solvers of labyrinth.py: name -> (prepare(lines), solve(prepared) -> path).
+    The preparation (building the map) is not part of the measured time.
+    """
+    table = {
+        "grid_bfs": (to_map, lambda grid: (traverse_breadth_first_search(grid, (1, 1), pos_directions) or (None, []))[1]),
+        "grid_dfs": (to_map, lambda grid: (traverse_depth_first_search(grid, (1, 1), pos_directions, [], set()) or (None, []))[1]),
+    }
+    for algorithm in search_algorithms:
+        table[f"maze_{algorithm}"] = (Maze, lambda maze, algorithm=algorithm: search(maze, algorithm).path)
+    return table
+
+
+def benchmark_scaling(sizes: list[int], algorithms: list[str], repeats: int = 5, warmup: int = 1, seed: int = 0) -> list[dict]:
+    """
+    Times every solver on generated maps of growing size.
+
+    :param sizes: side lengths of the square maps
+    :param algorithms: names of the generator algorithms
+    :param repeats: measured runs per solver and map
+    :param warmup: unmeasured runs before the measurement
+    :param seed: seed of the generator
+    :return: list of rows {"generator", "size", "solver", "path", "repeats", "min_ms", "median_ms", "mean_ms"}
+    """
+    rows = []
+    for algorithm in algorithms:
+        for size in sizes:
+            lines = generate_maze(size, size, algorithm, seed)
+            for name, (prepare, solve) in solvers().items():
+                prepared = prepare(lines)
+                for _ in range(warmup):
+                    solve(prepared)
+
+                times = []
+                for _ in range(repeats):
+                    start_time = time.perf_counter()
+                    path = solve(prepared)
+                    times.append((time.perf_counter() - start_time) * 1000)
+                rows.append({"generator": algorithm, "size": size, "solver": name, "path": len(path),
+                             "repeats": repeats, "min_ms": min(times), "median_ms": statistics.median(times),
+                             "mean_ms": statistics.fmean(times)})
+    return rows
+
+
+def save_report(rows: list[dict], filename: str):
+    """
+    Saves benchmark rows as JSON (file name ending in .json) or CSV.
+
+    :param rows: rows returned by benchmark_scaling
+    :param filename: the name of the output file
+    """
+    with open(filename, "w", newline="") as f:
+        if filename.endswith(".json"):
+            json.dump(rows, f, indent=2)
+        else:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else [])
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for the labyrinth solvers.")
+    parser.add_argument("benchmark", choices=["search", "scaling"],
+                        help="search: nodes expanded and time of all search algorithms, "
+                             "scaling: time of all solvers on generated maps of growing size")
+    parser.add_argument("-s", "--sizes", type=int, nargs="+", default=[101, 501, 1001],
+                        help="Side lengths of the generated maps (default: 101 501 1001)")
+    parser.add_argument("-g", "--generators", nargs="+", choices=list(generators), default=["backtracker", "prim", "rooms"],
+                        help="Generator algorithms (default: backtracker prim rooms)")
+    parser.add_argument("-r", "--repeats", type=int, default=5, help="Measured runs per solver and map (default: 5)")
+    parser.add_argument("-w", "--warmup", type=int, default=1, help="Unmeasured runs before measuring (default: 1)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generator (default: 0)")
+    parser.add_argument("-o", "--output", default="labyrinth_benchmark.csv",
+                        help="Report file, .json for JSON, otherwise CSV (default: labyrinth_benchmark.csv)")
+    args = parser.parse_args()
+
+    if args.benchmark == "search":
+        directory = os.path.dirname(os.path.abspath(__file__))
+        mazes = {f"l{i}": Maze.from_file(os.path.join(directory, f"l{i}.txt")) for i in range(1, 6)}
+        for algorithm in args.generators:
+            for size in args.sizes:
+                mazes[f"{algorithm} {size}"] = Maze(generate_maze(size, size, algorithm, args.seed))
+
+        print(f"{'map':>16} {'algorithm':>14} {'path':>8} {'expanded':>10} {'ms':>10}")
+        for name, algorithm, length, expanded, ms in benchmark_search(mazes, args.repeats):
+            print(f"{name:>16} {algorithm:>14} {length:>8} {expanded:>10} {ms:>10.2f}")
+    elif args.benchmark == "scaling":
+        rows = benchmark_scaling(args.sizes, args.generators, args.repeats, args.warmup, args.seed)
+        print(f"{'generator':>12} {'size':>6} {'solver':>20} {'path':>8} {'min ms':>10} {'median ms':>10}")
+        for row in rows:
+            print(f"{row['generator']:>12} {row['size']:>6} {row['solver']:>20} {row['path']:>8} "
+                  f"{row['min_ms']:>10.2f} {row['median_ms']:>10.2f}")
+        save_report(rows, args.output)
+        print("Results saved as", args.output)
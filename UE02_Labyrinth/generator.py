@@ -0,0 +1,215 @@
+__author__ = "Luka Pacar"
+
+import argparse
+import random
+
+WALL = ord('#')
+FREE = ord(' ')
+
+
+def _room_grid(rows: int, columns: int) -> tuple[int, int]:
+    """Number of rooms (cells at odd coordinates) per column and per row of a perfect maze."""
+    if rows < 3 or columns < 3:
+        raise ValueError("a maze needs at least 3 rows and 3 columns")
+    return (rows - 1) // 2, (columns - 1) // 2
+
+
+def generate_backtracker(rows: int, columns: int, rng: random.Random) -> bytearray:
+    """
+    Perfect maze with the recursive backtracker (randomized depth first search, explicit stack):
+    long corridors with few branches.
+
+    :param rows: number of rows of the map
+    :param columns: number of columns of the map
+    :param rng: the random generator
+    :return: the map as flat bytearray (row * columns + column)
+    """
+    height, width = _room_grid(rows, columns)
+    cells = bytearray([WALL]) * (rows * columns)
+    visited = bytearray(height * width)
+
+    visited[0] = 1
+    cells[columns + 1] = FREE
+    stack = [0]
+    while stack:
+        room = stack[-1]
+        i, j = divmod(room, width)
+        neighbours = []
+        if i > 0 and not visited[room - width]:
+            neighbours.append(room - width)
+        if j < width - 1 and not visited[room + 1]:
+            neighbours.append(room + 1)
+        if i < height - 1 and not visited[room + width]:
+            neighbours.append(room + width)
+        if j > 0 and not visited[room - 1]:
+            neighbours.append(room - 1)
+        if not neighbours:
+            stack.pop()
+            continue
+
+        neighbour = rng.choice(neighbours)
+        visited[neighbour] = 1
+        ni, nj = divmod(neighbour, width)
+        # Zielraum und die Wand dazwischen öffnen
+        cells[(2 * ni + 1) * columns + 2 * nj + 1] = FREE
+        cells[(i + ni + 1) * columns + j + nj + 1] = FREE
+        stack.append(neighbour)
+    return cells
+
+
+def generate_prim(rows: int, columns: int, rng: random.Random) -> bytearray:
+    """
+    Perfect maze with randomized Prim: the maze grows from the start at a random frontier room,
+    which gives many short dead ends.
+
+    :param rows: number of rows of the map
+    :param columns: number of columns of the map
+    :param rng: the random generator
+    :return: the map as flat bytearray (row * columns + column)
+    """
+    height, width = _room_grid(rows, columns)
+    cells = bytearray([WALL]) * (rows * columns)
+    visited = bytearray(height * width)
+
+    frontier = []  # (Raum, Raum von dem aus er erreicht wurde)
+
+    def add(room: int):
+        visited[room] = 1
+        i, j = divmod(room, width)
+        cells[(2 * i + 1) * columns + 2 * j + 1] = FREE
+        if i > 0 and not visited[room - width]:
+            frontier.append((room - width, room))
+        if j < width - 1 and not visited[room + 1]:
+            frontier.append((room + 1, room))
+        if i < height - 1 and not visited[room + width]:
+            frontier.append((room + width, room))
+        if j > 0 and not visited[room - 1]:
+            frontier.append((room - 1, room))
+
+    add(0)
+    while frontier:
+        index = rng.randrange(len(frontier))
+        frontier[index], frontier[-1] = frontier[-1], frontier[index]
+        room, origin = frontier.pop()
+        if visited[room]:
+            continue
+        (i, j), (oi, oj) = divmod(room, width), divmod(origin, width)
+        cells[(i + oi + 1) * columns + j + oj + 1] = FREE
+        add(room)
+    return cells
+
+
+def generate_rooms(rows: int, columns: int, rng: random.Random, room_size: int = 16) -> bytearray:
+    """
+    Open rooms of about room_size x room_size cells, every wall between two neighbouring rooms
+    has one door of 1 to 3 cells, so all rooms are connected.
+
+    :param rows: number of rows of the map
+    :param columns: number of columns of the map
+    :param rng: the random generator
+    :param room_size: distance between two room walls
+    :return: the map as flat bytearray (row * columns + column)
+    """
+    cells = bytearray([FREE]) * (rows * columns)
+    wall_rows = [*range(0, rows - 1, room_size), rows - 1]
+    wall_columns = [*range(0, columns - 1, room_size), columns - 1]
+    for row in wall_rows:
+        cells[row * columns:(row + 1) * columns] = bytes([WALL]) * columns
+    for column in wall_columns:
+        cells[column::columns] = bytes([WALL]) * rows
+
+    # Türen in die inneren Wände
+    for row in wall_rows[1:-1]:
+        for left, right in zip(wall_columns, wall_columns[1:]):
+            if right - left < 2:
+                continue
+            door = rng.randrange(left + 1, right)
+            for column in range(door, min(door + rng.randint(1, 3), right)):
+                cells[row * columns + column] = FREE
+    for column in wall_columns[1:-1]:
+        for top, bottom in zip(wall_rows, wall_rows[1:]):
+            if bottom - top < 2:
+                continue
+            door = rng.randrange(top + 1, bottom)
+            for row in range(door, min(door + rng.randint(1, 3), bottom)):
+                cells[row * columns + column] = FREE
+    return cells
+
+
+def generate_random(rows: int, columns: int, rng: random.Random, wall_ratio: float = 0.25) -> bytearray:
+    """
+    Open map with randomly scattered walls (the destination is not guaranteed to be reachable).
+
+    :param rows: number of rows of the map
+    :param columns: number of columns of the map
+    :param rng: the random generator
+    :param wall_ratio: probability of a wall inside the border
+    :return: the map as flat bytearray (row * columns + column)
+    """
+    cells = bytearray(WALL if rng.random() < wall_ratio else FREE for _ in range(rows * columns))
+    cells[:columns] = cells[-columns:] = bytes([WALL]) * columns
+    cells[::columns] = cells[columns - 1::columns] = bytes([WALL]) * rows
+    return cells
+
+
+generators = {
+    "backtracker": generate_backtracker,
+    "prim": generate_prim,
+    "rooms": generate_rooms,
+    "random": generate_random,
+}
+
+
+def generate_maze(rows: int, columns: int, algorithm: str = "backtracker", seed: int = None) -> list[str]:
+    """
+    Generates a map in the format of the l*.txt files: '#' walls, ' ' free cells, the start at (1, 1)
+    and the destination 'A' in the room closest to the bottom right corner.
+
+    :param rows: number of rows of the map (at least 3)
+    :param columns: number of columns of the map (at least 3)
+    :param algorithm: name of the algorithm in generators
+    :param seed: seed of the random generator (same seed -> same map)
+    :return: the map lines (without line breaks)
+
+    >>> generate_maze(5, 7, "backtracker", seed=1) == generate_maze(5, 7, "backtracker", seed=1)
+    True
+    >>> print("\\n".join(generate_maze(5, 5, "prim", seed=0)))
+    #####
+    #   #
+    # ###
+    #  A#
+    #####
+    """
+    cells = generators[algorithm](rows, columns, random.Random(seed))
+    goal_row = rows - 2 if rows % 2 == 1 else rows - 3
+    goal_column = columns - 2 if columns % 2 == 1 else columns - 3
+    cells[columns + 1] = FREE
+    cells[goal_row * columns + goal_column] = ord('A')
+    text = cells.decode("latin-1")
+    return [text[row * columns:(row + 1) * columns] for row in range(rows)]
+
+
+def save_maze(lines: list[str], filename: str):
+    """
+    Saves a map in the format of the l*.txt files.
+
+    :param lines: the map lines
+    :param filename: the name of the output file
+    """
+    with open(filename, "w") as f:
+        f.write("\n".join(lines))
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generates maps for labyrinth.py.")
+    parser.add_argument("-a", "--algorithm", choices=list(generators), default="backtracker",
+                        help="Generator algorithm (default: backtracker)")
+    parser.add_argument("-s", "--size", type=int, nargs=2, metavar=("ROWS", "COLUMNS"), default=[201, 201],
+                        help="Size of the map (default: 201 201)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the random generator")
+    parser.add_argument("-o", "--output", default="maze.txt", help="Output file (default: maze.txt)")
+    args = parser.parse_args()
+
+    save_maze(generate_maze(*args.size, args.algorithm, args.seed), args.output)
+    print(f"{args.algorithm} {args.size[0]}x{args.size[1]} -> {args.output}")
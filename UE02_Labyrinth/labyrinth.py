@@ -1,5 +1,14 @@
 # Luka Pacar 2025
 from collections import deque
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heapify, heappop, heappush
+from typing import Iterator, NamedTuple
+import argparse
+import glob
+import json
+import os
+import sys
 import time
 
 __author__ = "Luka Pacar"
@@ -12,57 +21,118 @@ def traverse_breadth_first_search(grid: list[list[str]], start_pos: tuple[int, i
     :param directions: The possible directions to take
     :return: [0] -> Ending-Point/Destination - [1] -> Path to the destination | Or None if there is no way to the destination
     """
+    if isinstance(grid, Maze):
+        return grid.breadth_first_search(start_pos, directions)
+
+    # Jeder Eintrag merkt sich nur seinen Vorgänger, der Pfad wird erst am Ziel zusammengesetzt
     queue = deque()
-    visited_points = set()
-    queue.append((start_pos, []))
+    parents = {}
+    queue.append((start_pos, None))
     while len(queue) > 0:
-        curr_pos, curr_path = queue.popleft()
-        curr_path = curr_path.copy()
-        curr_path.append(curr_pos)
+        curr_pos, parent = queue.popleft()
 
-        if curr_pos in visited_points or grid[curr_pos[0]][curr_pos[1]] == '#':
+        if curr_pos in parents or grid[curr_pos[0]][curr_pos[1]] == '#':
             continue
-        visited_points.add(curr_pos)
+        parents[curr_pos] = parent
 
         if grid[curr_pos[0]][curr_pos[1]] == 'A':
-            return curr_pos, curr_path
+            return curr_pos, build_path(parents, curr_pos)
+
+        for _, vector in directions.items():
+            new_pos = (curr_pos[0] + vector[0], curr_pos[1] + vector[1])
+            if is_out_of_bounce(grid, new_pos) or new_pos in parents or grid[new_pos[0]][new_pos[1]] == 'X':
+                continue
+            queue.append((new_pos, curr_pos))
+
+def build_path(parents: dict, end):
+    """
+    Follows the predecessors from the end back to the start.
+    :param parents: Predecessor of every visited node (None for the start).
+    :param end: The last node of the path.
+    :return: The path from the start to end.
+
+    >>> build_path({(1, 1): None, (1, 2): (1, 1), (2, 2): (1, 2)}, (2, 2))
+    [(1, 1), (1, 2), (2, 2)]
+    """
+    path = [end]
+    while parents[path[-1]] is not None:
+        path.append(parents[path[-1]])
+    path.reverse()
+    return path
+
+def distance_map(grid: list[list[str]], start_pos: tuple[int, int], directions: dict[str, tuple[int, int]]) -> dict[tuple[int, int], int]:
+    """
+    Runs a complete Breadth First Search and returns the distance of every reachable position,
+    so many "distance from start to X" queries can be answered from one traversal.
+    :param grid: Map to traverse (for a compiled Maze see Maze.distance_map).
+    :param start_pos: The starting position in the map.
+    :param directions: The possible directions to take.
+    :return: Position -> number of steps from start_pos, unreachable positions are missing.
+
+    >>> lines = ['#####', '#  X#', '# #A#', '#   #', '#####']
+    >>> distance_map(lines, (1, 1), pos_directions)[(2, 3)] == len(traverse_breadth_first_search(lines, (1, 1), pos_directions)[1]) - 1
+    True
+    >>> distance_map(lines, (1, 1), pos_directions) == distance_map(Maze(lines), (1, 1), pos_directions)
+    True
+    """
+    if isinstance(grid, Maze):
+        return grid.distance_map(start_pos, directions)
+    if is_out_of_bounce(grid, start_pos) or grid[start_pos[0]][start_pos[1]] == '#':
+        return {}
+
+    # dieselben Regeln wie traverse_breadth_first_search: '#' und 'X' werden nicht betreten
 
+    distances = {start_pos: 0}
+    queue = deque([start_pos])
+    while len(queue) > 0:
+        curr_pos = queue.popleft()
         for _, vector in directions.items():
             new_pos = (curr_pos[0] + vector[0], curr_pos[1] + vector[1])
-            if is_out_of_bounce(grid, new_pos) or new_pos in visited_points or grid[new_pos[0]][new_pos[1]] == 'X':
+            if is_out_of_bounce(grid, new_pos) or new_pos in distances or grid[new_pos[0]][new_pos[1]] in '#X':
                 continue
-            queue.append((new_pos, curr_path))
+            distances[new_pos] = distances[curr_pos] + 1
+            queue.append(new_pos)
+    return distances
 
 def traverse_depth_first_search(grid: list[list[str]], curr_pos: tuple[int, int], directions: dict[str, tuple[int, int]], curr_path: list[tuple[int, int]], visited_points: set[tuple[int, int]]) -> tuple[tuple[int, int], list[tuple[int, int]]] | None:
     """
         Traverses the graph using Depth First Search (Tiefensuche).
-        :param grid: Map to traverse.
+        Works with an explicit stack, so long corridors do not hit the recursion limit.
+        :param grid: Map to traverse (for a compiled Maze curr_path and visited_points are not used).
         :param curr_pos: The current position in the map.
         :param directions: The possible directions to take.
-        :param curr_path: The current path taken to the curr_pos.
+        :param curr_path: The current path taken to the curr_pos (extended in place).
         :param visited_points: The current visited points up until this point.
         :return: [0] -> Ending-Point/Destination - [1] -> Path to the destination | Or None if there is no way to the destination.
         """
-    if is_out_of_bounce(grid, curr_pos):
-        return None
-
-    if curr_pos in visited_points or grid[curr_pos[0]][curr_pos[1]] == '#':
-        return None
-    visited_points.add(curr_pos)
+    if isinstance(grid, Maze):
+        return grid.depth_first_search(curr_pos, directions)
 
-    curr_path.append(curr_pos)
+    # Expliziter Stack statt Rekursion: curr_path ist der aktuelle Pfad, next_direction[i] die nächste
+    # Richtung, die von curr_path[start_length + i] aus probiert wird
+    vectors = list(directions.values())
+    start_length = len(curr_path)
+    next_direction = []
+    new_pos = curr_pos
+    while True:
+        if not (is_out_of_bounce(grid, new_pos) or new_pos in visited_points or grid[new_pos[0]][new_pos[1]] == '#'):
+            visited_points.add(new_pos)
+            curr_path.append(new_pos)
+            if grid[new_pos[0]][new_pos[1]] == 'A':
+                return new_pos, curr_path
+            next_direction.append(0)
 
-    if grid[curr_pos[0]][curr_pos[1]] == 'A':
-        return curr_pos, curr_path
+        # Sackgassen zurückgehen, bis eine Position noch unprobierte Richtungen hat
+        while next_direction and next_direction[-1] == len(vectors):
+            next_direction.pop()
+            curr_path.pop()
+        if not next_direction:
+            return None
 
-    for _, vector in directions.items():
-        new_pos = (curr_pos[0] + vector[0], curr_pos[1] + vector[1])
-        copied_path = curr_path.copy()
-        result = traverse_depth_first_search(grid, new_pos, directions, copied_path, visited_points)
-        if result is not None:
-            return result
-
-    return None
+        vector = vectors[next_direction[-1]]
+        next_direction[-1] += 1
+        last_pos = curr_path[start_length + len(next_direction) - 1]
+        new_pos = (last_pos[0] + vector[0], last_pos[1] + vector[1])
 
 def is_out_of_bounce(grid: list[list[str]], curr_pos: tuple[int, int]) -> bool:
     """
@@ -80,12 +150,414 @@ pos_directions = {
     "LEFT": (0, -1),
 }
 
-def to_map(map_lines: list[str]) -> list[list[str]]:
+WALL = ord('#')
+GOAL = ord('A')
+# 0 für Wände, 1 für alle begehbaren Zeichen
+FREE_TABLE = bytes(0 if i == WALL else 1 for i in range(256))
+# traverse_breadth_first_search betritt auch keine 'X'-Felder
+BFS_FREE_TABLE = bytes(0 if i in (WALL, ord('X')) else 1 for i in range(256))
+
+class Maze:
+    """
+    Compiled form of a map: all rows lie in one flat bytearray with a wall border around the map.
+    A cell is addressed by its integer id (row + 1) * width + (column + 1), the neighbours of a cell
+    are reached by adding fixed offsets, so no bounds checks are needed.
+    """
+
+    def __init__(self, map_lines: list[str]):
+        rows = [line.rstrip("\r\n") for line in map_lines]
+        self.rows = len(rows)
+        self.columns = max(map(len, rows), default=0)
+        self.width = self.columns + 2  # je eine Wandspalte links und rechts
+
+        border = "#" * self.width
+        text = border + "".join("#" + row.ljust(self.columns, "#") + "#" for row in rows) + border
+        self.cells = bytearray(text.encode("latin-1"))
+        self.free = self.cells.translate(FREE_TABLE)
+
+    @classmethod
+    def from_file(cls, filename: str) -> "Maze":
+        """Reads and compiles a map file."""
+        with open(filename, "r") as f:
+            return cls(f.read().splitlines())
+
+    def cell_id(self, pos: tuple[int, int]) -> int:
+        """Converts a (row, column) position of the map into a cell id."""
+        return (pos[0] + 1) * self.width + pos[1] + 1
+
+    def position(self, cell: int) -> tuple[int, int]:
+        """Converts a cell id back into a (row, column) position of the map."""
+        row, column = divmod(cell, self.width)
+        return row - 1, column - 1
+
+    def offsets(self, directions: dict[str, tuple[int, int]]) -> list[int]:
+        """Converts the direction vectors into cell id offsets (same order)."""
+        return [vector[0] * self.width + vector[1] for vector in directions.values()]
+
+    def find(self, char: str) -> list[int]:
+        """Returns the cell ids of all cells with the given character."""
+        code = ord(char)
+        found = []
+        cell = self.cells.find(code)
+        while cell != -1:
+            found.append(cell)
+            cell = self.cells.find(code, cell + 1)
+        return found
+
+    def mask(self, cells: list[int]) -> bytearray:
+        """Returns a bytearray with 1 for the given cell ids (fast membership test)."""
+        marks = bytearray(len(self.cells))
+        for cell in cells:
+            marks[cell] = 1
+        return marks
+
+    def trace(self, parents: array, cell: int) -> list[int]:
+        """Follows the predecessors (-1 = start) back from cell and returns the path from the start."""
+        path = [cell]
+        while parents[path[-1]] != -1:
+            path.append(parents[path[-1]])
+        path.reverse()
+        return path
+
+    def bfs_free(self, start: int) -> bytearray:
+        """
+        Free cells for the breadth first searches: like traverse_breadth_first_search, 'X' is not entered,
+        only the start may lie on one.
+        """
+        free = self.cells.translate(BFS_FREE_TABLE)
+        free[start] = self.free[start]
+        return free
+
+    def breadth_first_search(self, start_pos: tuple[int, int], directions: dict[str, tuple[int, int]]) -> tuple[tuple[int, int], list[tuple[int, int]]] | None:
+        """
+        Breadth First Search on the compiled map. Cells are marked as visited when they are queued
+        and only their predecessor is stored, the path is built once at the destination.
+        :param start_pos: The starting position in the map.
+        :param directions: The possible directions to take.
+        :return: [0] -> Ending-Point/Destination - [1] -> Path to the destination | Or None if there is no way to the destination
+
+        >>> lines = ['#####', '# X #', '#X#A#', '#####']
+        >>> Maze(lines).breadth_first_search((1, 1), pos_directions) == traverse_breadth_first_search(lines, (1, 1), pos_directions)
+        True
+        >>> lines = ['#####', '#  X#', '# #A#', '#   #', '#####']
+        >>> result = Maze(lines).breadth_first_search((1, 1), pos_directions)
+        >>> result
+        ((2, 3), [(1, 1), (2, 1), (3, 1), (3, 2), (3, 3), (2, 3)])
+        >>> result == traverse_breadth_first_search(lines, (1, 1), pos_directions)
+        True
+        """
+        start = self.cell_id(start_pos)
+        end, path, _ = breadth_first(self, [start], self.find('A'), directions, self.bfs_free(start))
+        if end == -1:
+            return None
+        return self.position(end), [self.position(node) for node in path]
+
+    def distance_map(self, start_pos: tuple[int, int], directions: dict[str, tuple[int, int]]) -> dict[tuple[int, int], int]:
+        """
+        Complete Breadth First Search on the compiled map, see distance_map.
+        :param start_pos: The starting position in the map.
+        :param directions: The possible directions to take.
+        :return: Position -> number of steps from start_pos, unreachable positions are missing.
+        """
+        distances = self.distances(start_pos, directions)
+        return {self.position(cell): distance for cell, distance in enumerate(distances) if distance >= 0}
+
+    def distances(self, start_pos: tuple[int, int], directions: dict[str, tuple[int, int]]) -> array:
+        """
+        Like distance_map, but returns the raw distance array (index = cell id, -1 = unreachable),
+        which needs 4 bytes per cell instead of a dict entry per reachable cell.
+        :param start_pos: The starting position in the map.
+        :param directions: The possible directions to take.
+        :return: Distance of every cell from start_pos.
+        """
+        offsets = self.offsets(directions)
+        start = self.cell_id(start_pos)
+        unvisited = self.bfs_free(start)
+        distances = array("i", [-1]) * len(self.cells)
+
+        if not unvisited[start]:
+            return distances
+        unvisited[start] = 0
+        # Ebene für Ebene, so muss keine Distanz pro Zelle aus dem Array gelesen werden
+        frontier = [start]
+        distance = 0
+        while frontier:
+            next_frontier = []
+            for cell in frontier:
+                distances[cell] = distance
+                for offset in offsets:
+                    neighbour = cell + offset
+                    if unvisited[neighbour]:
+                        unvisited[neighbour] = 0
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+            distance += 1
+        return distances
+
+    def depth_first_search(self, start_pos: tuple[int, int], directions: dict[str, tuple[int, int]]) -> tuple[tuple[int, int], list[tuple[int, int]]] | None:
+        """
+        Depth First Search on the compiled map with an explicit stack, the directions are tried in the given order.
+        One path list is kept, a dead end removes its cell again, so the path length is not limited by the recursion limit.
+        :param start_pos: The starting position in the map.
+        :param directions: The possible directions to take.
+        :return: [0] -> Ending-Point/Destination - [1] -> Path to the destination | Or None if there is no way to the destination
+        """
+        end, path, _ = depth_first(self, [self.cell_id(start_pos)], self.find('A'), directions)
+        if end == -1:
+            return None
+        return self.position(end), [self.position(node) for node in path]
+
+class SearchResult(NamedTuple):
+    end: tuple[int, int] | None         # erreichtes Ziel (None, wenn keines erreichbar ist)
+    path: list[tuple[int, int]]         # Pfad vom Start zum Ziel
+    expanded: int                       # Anzahl expandierter Zellen
+
+def breadth_first(maze: Maze, starts: list[int], targets: list[int], directions: dict[str, tuple[int, int]], free: bytearray = None) -> tuple[int, list[int], int]:
+    """
+    Multi-source Breadth First Search, all starts are queued at distance 0.
+    :param maze: The compiled map.
+    :param starts: Cell ids of the starting positions.
+    :param targets: Cell ids of the destinations.
+    :param directions: The possible directions to take.
+    :param free: 1 for every enterable cell id (default: maze.free)
+    :return: (reached target or -1, path as cell ids, expanded cells)
+    """
+    offsets = maze.offsets(directions)
+    is_target = maze.mask(targets)
+    unvisited = bytearray(maze.free if free is None else free)  # Wände und besuchte Zellen sind 0
+    parents = array("i", [-1]) * len(unvisited)
+
+    queue = deque()
+    for start in starts:
+        if unvisited[start]:
+            unvisited[start] = 0
+            queue.append(start)
+    expanded = 0
+    while queue:
+        cell = queue.popleft()
+        expanded += 1
+        if is_target[cell]:
+            return cell, maze.trace(parents, cell), expanded
+
+        for offset in offsets:
+            neighbour = cell + offset
+            if unvisited[neighbour]:
+                unvisited[neighbour] = 0
+                parents[neighbour] = cell
+                queue.append(neighbour)
+    return -1, [], expanded
+
+def depth_first(maze: Maze, starts: list[int], targets: list[int], directions: dict[str, tuple[int, int]]) -> tuple[int, list[int], int]:
+    """
+    Depth First Search with an explicit stack, the directions are tried in the given order.
+    One path list is kept, a dead end removes its cell again, so the path length is not limited by the recursion limit.
+    Several starts are tried one after another (cells visited from an earlier start are not visited again).
+    :param maze: The compiled map.
+    :param starts: Cell ids of the starting positions.
+    :param targets: Cell ids of the destinations.
+    :param directions: The possible directions to take.
+    :return: (reached target or -1, path as cell ids, expanded cells)
+    """
+    offsets = maze.offsets(directions)
+    directions_count = len(offsets)
+    is_target = maze.mask(targets)
+    unvisited = bytearray(maze.free)
+    expanded = 0
+
+    for cell in starts:
+        path = []            # aktueller Pfad, wird beim Zurückgehen gekürzt
+        next_direction = []  # nächste zu probierende Richtung pro Pfadzelle
+        while True:
+            if unvisited[cell]:
+                unvisited[cell] = 0
+                expanded += 1
+                path.append(cell)
+                if is_target[cell]:
+                    return cell, path, expanded
+                next_direction.append(0)
+
+            while next_direction and next_direction[-1] == directions_count:
+                next_direction.pop()
+                path.pop()
+            if not next_direction:
+                break
+
+            index = next_direction[-1]
+            next_direction[-1] = index + 1
+            cell = path[-1] + offsets[index]
+    return -1, [], expanded
+
+def a_star(maze: Maze, starts: list[int], targets: list[int], directions: dict[str, tuple[int, int]]) -> tuple[int, list[int], int]:
+    """
+    A* search with the Manhattan distance to the nearest target as heuristic.
+    The distance is divided by the largest Manhattan length of one step, so the heuristic stays
+    admissible (and consistent) for direction sets with diagonal or longer moves as well.
+    :param maze: The compiled map.
+    :param starts: Cell ids of the starting positions.
+    :param targets: Cell ids of the destinations.
+    :param directions: The possible directions to take.
+    :return: (reached target or -1, shortest path as cell ids, expanded cells)
+    """
+    offsets = maze.offsets(directions)
+    step = max((abs(vector[0]) + abs(vector[1]) for vector in directions.values()), default=1)
+    width = maze.width
+    goals = [divmod(target, width) for target in targets]
+    if not goals:
+        return -1, [], 0
+
+    def heuristic(cell: int) -> int:
+        row, column = divmod(cell, width)
+        return min(abs(row - goal_row) + abs(column - goal_column) for goal_row, goal_column in goals) // step
+
+    free = maze.free
+    is_target = maze.mask(targets)
+    closed = bytearray(len(free))
+    costs = array("i", [-1]) * len(free)
+    parents = array("i", [-1]) * len(free)
+
+    heap = []
+    for start in set(starts):
+        if free[start]:
+            costs[start] = 0
+            estimate = heuristic(start)
+            heap.append((estimate, estimate, start))
+    heapify(heap)
+
+    expanded = 0
+    while heap:
+        _, _, cell = heappop(heap)
+        if closed[cell]:
+            continue  # veralteter Eintrag, die Zelle wurde schon günstiger expandiert
+        closed[cell] = 1
+        expanded += 1
+        if is_target[cell]:
+            return cell, maze.trace(parents, cell), expanded
+
+        cost = costs[cell] + 1
+        for offset in offsets:
+            neighbour = cell + offset
+            if free[neighbour] and not closed[neighbour] and (costs[neighbour] == -1 or cost < costs[neighbour]):
+                costs[neighbour] = cost
+                parents[neighbour] = cell
+                estimate = heuristic(neighbour)
+                # bei gleichem f zuerst die Zelle, die näher am Ziel liegt
+                heappush(heap, (cost + estimate, estimate, neighbour))
+    return -1, [], expanded
+
+def bidirectional(maze: Maze, starts: list[int], targets: list[int], directions: dict[str, tuple[int, int]]) -> tuple[int, list[int], int]:
+    """
+    Bidirectional Breadth First Search: one search from all starts and one (against the directions)
+    from all targets, always the smaller frontier is expanded by one level.
+    Both searches check the other side when they discover a cell, so the first meeting gives a shortest path.
+    :param maze: The compiled map.
+    :param starts: Cell ids of the starting positions.
+    :param targets: Cell ids of the destinations.
+    :param directions: The possible directions to take.
+    :return: (reached target or -1, shortest path as cell ids, expanded cells)
+    """
+    offsets = maze.offsets(directions)
+    free = maze.free
+    # Vorgänger Richtung Start bzw. Nachfolger Richtung Ziel, -1 = Start/Ziel selbst, -2 = nicht gesehen
+    forward = array("i", [-2]) * len(free)
+    backward = array("i", [-2]) * len(free)
+
+    forward_frontier = []
+    for start in starts:
+        if free[start] and forward[start] == -2:
+            forward[start] = -1
+            forward_frontier.append(start)
+    backward_frontier = []
+    for target in targets:
+        if free[target] and backward[target] == -2:
+            backward[target] = -1
+            backward_frontier.append(target)
+            if forward[target] != -2:
+                return target, [target], 0
+
+    expanded = 0
+    meeting = -1
+    while forward_frontier and backward_frontier and meeting == -1:
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, seen, other, step_offsets = forward_frontier, forward, backward, offsets
+        else:
+            frontier, seen, other, step_offsets = backward_frontier, backward, forward, [-offset for offset in offsets]
+
+        next_frontier = []
+        for cell in frontier:
+            expanded += 1
+            for offset in step_offsets:
+                neighbour = cell + offset
+                if free[neighbour] and seen[neighbour] == -2:
+                    seen[neighbour] = cell
+                    if other[neighbour] != -2:
+                        meeting = neighbour
+                        break
+                    next_frontier.append(neighbour)
+            if meeting != -1:
+                break
+
+        if seen is forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    if meeting == -1:
+        return -1, [], expanded
+    path = [meeting]
+    while forward[path[-1]] != -1:
+        path.append(forward[path[-1]])
+    path.reverse()
+    while backward[path[-1]] != -1:
+        path.append(backward[path[-1]])
+    return path[-1], path, expanded
+
+# Alle Suchverfahren haben dieselbe Signatur (maze, starts, targets, directions), weitere können hier eingetragen werden
+search_algorithms = {
+    "bfs": breadth_first,
+    "dfs": depth_first,
+    "astar": a_star,
+    "bidirectional": bidirectional,
+}
+
+def search(grid: list[list[str]] | Maze, algorithm: str = "bfs", starts: list[tuple[int, int]] = None, goals: list[tuple[int, int]] = None, directions: dict[str, tuple[int, int]] = None) -> SearchResult:
+    """
+    Searches a path from one of the starts to one of the goals with the given algorithm.
+    :param grid: Map to traverse (character arrays or compiled Maze).
+    :param algorithm: Name of the algorithm in search_algorithms.
+    :param starts: Starting positions (default: all 'S' cells, or (1, 1) if the map has none).
+    :param goals: Destinations (default: all 'A' cells).
+    :param directions: The possible directions to take (default: pos_directions).
+    :return: SearchResult with the reached goal, the path and the number of expanded cells.
+
+    >>> maze = to_map(["#######", "#S  # #", "# # #A#", "#   A #", "#######"], compiled=True)
+    >>> [(name, len(search(maze, name).path)) for name in ("bfs", "astar", "bidirectional")]
+    [('bfs', 6), ('astar', 6), ('bidirectional', 6)]
+    >>> search(maze, "dfs", goals=[(2, 5)]).end
+    (2, 5)
+    """
+    maze = grid if isinstance(grid, Maze) else Maze(["".join(line) for line in grid])
+    if directions is None:
+        directions = pos_directions
+    start_cells = maze.find('S') if starts is None else [maze.cell_id(pos) for pos in starts]
+    if not start_cells:
+        start_cells = [maze.cell_id((1, 1))]
+    goal_cells = maze.find('A') if goals is None else [maze.cell_id(pos) for pos in goals]
+
+    end, path, expanded = search_algorithms[algorithm](maze, start_cells, goal_cells, directions)
+    if end == -1:
+        return SearchResult(None, [], expanded)
+    return SearchResult(maze.position(end), [maze.position(node) for node in path], expanded)
+
+def to_map(map_lines: list[str], compiled: bool = False) -> list[list[str]] | Maze:
     """
     Takes string lines and converts them to a traversable map.
     :param map_lines: A list of lines to be converted.
+    :param compiled: Return a compiled Maze instead of character arrays.
     :return: The Map but with strings converted to character arrays.
     """
+    if compiled:
+        return Maze(map_lines)
+
     output = []
     for line in map_lines:
         curr_line = []
@@ -94,18 +566,115 @@ def to_map(map_lines: list[str]) -> list[list[str]]:
         output.append(curr_line)
     return output
 
+def render_map(grid: list[list[str]]) -> str:
+    """ Returns the given map as one string. """
+    return "".join("".join(line) for line in grid)
+
 def print_map(grid: list[list[str]]):
-    """ Prints the given map. """
-    for line in grid:
-        for char in line:
-            print(char, end ="")
+    """ Prints the given map (with one write). """
+    sys.stdout.write(render_map(grid))
 
 def mark_map(grid, given_path):
     """Marks the given path in the given map."""
     for node in given_path:
         grid[node[0]][node[1]] = 'O'
 
-if __name__ == "__main__":
+def encode_path(path: list[tuple[int, int]], directions: dict[str, tuple[int, int]]) -> str:
+    """
+    Encodes a path as the first letters of the direction names of its steps.
+    :param path: The path (consecutive positions).
+    :param directions: The directions the path was found with (the first letters have to be unique).
+    :return: One letter per step.
+
+    >>> encode_path([(1, 1), (1, 2), (2, 2), (2, 1)], pos_directions)
+    'RDL'
+    """
+    letters = {vector: name[0] for name, vector in directions.items()}
+    return "".join(letters[(b[0] - a[0], b[1] - a[1])] for a, b in zip(path, path[1:]))
+
+def decode_path(start_pos: tuple[int, int], moves: str, directions: dict[str, tuple[int, int]]) -> list[tuple[int, int]]:
+    """
+    Reverses encode_path.
+    :param start_pos: The first position of the path.
+    :param moves: One letter per step.
+    :param directions: The directions used for encoding.
+    :return: The path.
+
+    >>> decode_path((1, 1), 'RDL', pos_directions)
+    [(1, 1), (1, 2), (2, 2), (2, 1)]
+    """
+    vectors = {name[0]: vector for name, vector in directions.items()}
+    path = [start_pos]
+    for move in moves:
+        vector = vectors[move]
+        path.append((path[-1][0] + vector[0], path[-1][1] + vector[1]))
+    return path
+
+def iter_map_files(patterns: list[str]) -> Iterator[str]:
+    """
+    Lists map files lazily: directories yield their *.txt files (sorted), everything else is used as glob pattern.
+    :param patterns: Directories, files or glob patterns.
+    :return: Iterator over the file names.
+    """
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            yield from sorted(entry.path for entry in os.scandir(pattern) if entry.is_file() and entry.name.endswith(".txt"))
+        else:
+            yield from glob.iglob(pattern)
+
+def solve_file(filename: str, algorithm: str = "bfs", render: bool = False) -> dict:
+    """
+    Loads, compiles and solves one map file (runs in the worker processes of solve_files).
+    :param filename: The map file.
+    :param algorithm: Name of the algorithm in search_algorithms.
+    :param render: Also return the map with the marked path.
+    :return: Result dict (file, algorithm, end, length, expanded, ms, start, moves[, map]).
+    """
+    with open(filename, "r") as f:
+        lines = f.read().splitlines(keepends=True)
+    maze = Maze(lines)
+
+    start_time = time.perf_counter()
+    result = search(maze, algorithm)
+    taken_time = time.perf_counter() - start_time
+
+    output = {"file": filename, "algorithm": algorithm, "end": result.end, "length": len(result.path),
+              "expanded": result.expanded, "ms": taken_time * 1000,
+              "start": result.path[0] if result.path else None, "moves": encode_path(result.path, pos_directions)}
+    if render:
+        grid = to_map(lines)
+        mark_map(grid, result.path)
+        if result.path:
+            grid[result.path[0][0]][result.path[0][1]] = 'S'
+        output["map"] = render_map(grid)
+    return output
+
+def solve_files(filenames, algorithm: str = "bfs", workers: int = 1, render: bool = False) -> Iterator[dict]:
+    """
+    Solves many map files, with workers > 1 on a process pool. The file names are consumed lazily and
+    at most 2 * workers maps are in flight, results are returned in input order.
+    :param filenames: Iterable of map files.
+    :param algorithm: Name of the algorithm in search_algorithms.
+    :param workers: Number of worker processes (1 = serial).
+    :param render: Also return the maps with the marked path.
+    :return: Iterator over the result dicts of solve_file.
+    """
+    if workers <= 1:
+        for filename in filenames:
+            yield solve_file(filename, algorithm, render)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for filename in filenames:
+            pending.append(pool.submit(solve_file, filename, algorithm, render))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def run_examples():
+    """ Solves l1.txt - l5.txt with DFS and BFS and prints the marked maps. """
     for file in ["l1", "l2", "l3", "l4", "l5"]:
         print(f"{file}:\n")
         with open(f"{file}.txt", "r") as f:
@@ -113,26 +682,49 @@ if __name__ == "__main__":
 
         grid_depth_first_search = to_map(lines)
         grid_breadth_first_search = to_map(lines).copy()
+        maze = to_map(lines, compiled=True)
 
         # DFS
         time_start_DFS = time.perf_counter()
-        results1, path = traverse_depth_first_search(grid_depth_first_search, (1,1), pos_directions, [], set())
+        results1, path = traverse_depth_first_search(maze, (1,1), pos_directions, [], set())
         taken_time_DFS = time.perf_counter() - time_start_DFS
 
         mark_map(grid_depth_first_search, path)
         grid_depth_first_search[1][1] = 'S'
 
         print_map(grid_depth_first_search)
-        print("Time taken: " + str(taken_time_DFS/1000) + "ms")
+        print("Time taken: " + str(taken_time_DFS * 1000) + "ms")
         print()
         # BFS
         time_start_BFS = time.perf_counter()
-        results2, path = traverse_breadth_first_search(grid_breadth_first_search, (1, 1), pos_directions)
+        results2, path = traverse_breadth_first_search(maze, (1, 1), pos_directions)
         taken_time_BFS = time.perf_counter() - time_start_BFS
 
         mark_map(grid_breadth_first_search, path)
         grid_breadth_first_search[1][1] = 'S'
 
         print_map(grid_breadth_first_search)
-        print("Time taken: " + str(taken_time_BFS/1000) + "ms")
-        print()
\ No newline at end of file
+        print("Time taken: " + str(taken_time_BFS * 1000) + "ms")
+        print()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Labyrinth solver, without files the examples l1.txt - l5.txt are solved.")
+    parser.add_argument("files", nargs="*", help="Map files, directories or glob patterns to solve")
+    parser.add_argument("-a", "--algorithm", choices=list(search_algorithms), default="bfs", help="Search algorithm (default: bfs)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Number of worker processes (default: 1)")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="JSON lines output file (default: results.jsonl)")
+    parser.add_argument("--render", action="store_true", help="Print every map with the marked path")
+    args = parser.parse_args()
+
+    if not args.files:
+        run_examples()
+    else:
+        solved = 0
+        with open(args.output, "w") as f_out:
+            for result in solve_files(iter_map_files(args.files), args.algorithm, args.workers, args.render):
+                rendered = result.pop("map", None)
+                if rendered is not None:
+                    sys.stdout.write(f"{result['file']}:\n{rendered}\n")
+                f_out.write(json.dumps(result) + "\n")
+                solved += 1
+        print(f"{solved} maps solved -> {args.output}")
\ No newline at end of file
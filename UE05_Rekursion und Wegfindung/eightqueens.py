@@ -1,36 +1,92 @@
 # Luka Pacar 5CN
 __author__ = "Luka Pacar"
 
-from abc import ABC, abstractmethod
+import argparse
+import os
+import time
+from abc import ABC
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+
+# Anzahl der (Figur, Brettgröße)-Kombinationen, deren Angriffstabellen behalten werden
+ATTACK_TABLE_CACHE_SIZE = 32
+
+@lru_cache(maxsize=ATTACK_TABLE_CACHE_SIZE)
+def attack_table(piece_type: type["Piece"], board_size: int) -> tuple[int, ...]:
+    """
+    Calculates the attack bitmask of every square (bit row * board_size + col), cached per piece type and board size.
+    :param piece_type: The type of piece
+    :param board_size: The size of the board
+    :return: attack mask per square index
+    """
+    table = []
+    for row in range(board_size):
+        for col in range(board_size):
+            mask = 0
+            for target_row, target_col in piece_type.attack_targets((row, col), board_size):
+                mask |= 1 << (target_row * board_size + target_col)
+            table.append(mask)
+    return tuple(table)
 
 
 class Piece(ABC):
+    # Schrittvektoren der Figur, sliding: die Figur zieht beliebig weit in Schrittrichtung
+    steps: list[tuple[int, int]] = []
+    sliding = False
 
-    @staticmethod
-    @abstractmethod
-    def non_attacking_configuration(piece_to_check, other_pieces, board_size):
+    @classmethod
+    def attack_targets(cls, position: tuple[int, int], board_size: int):
         """
-        Checks if the piece_to_check is attacked by pieces included in other_pieces.
-        All pieces have to be of the same type.
+        Yields all squares attacked from position (other pieces do not block).
+        :param position: The position of the piece
         :param board_size: The size of the board
-        :param piece_to_check: The piece to be checked for the attack status
-        :param other_pieces: The other pieces that could attack the piece_to_check
-        :return: True if the piece_to_check is not attacked
+        :return: Generator of attacked positions
+        """
+        for step in cls.steps:
+            target = (position[0] + step[0], position[1] + step[1])
+            while 0 <= target[0] < board_size and 0 <= target[1] < board_size:
+                yield target
+                if not cls.sliding:
+                    break
+                target = (target[0] + step[0], target[1] + step[1])
+
+    @classmethod
+    def attack_table(cls, board_size: int) -> tuple[int, ...]:
+        """ The attack bitmask of every square, see attack_table. """
+        return attack_table(cls, board_size)
+
+    @classmethod
+    def non_attacking_configuration(cls, square: int, occupancy: int, board_size: int) -> bool:
+        """
+        Checks if a piece placed on the free square is attacked by the pieces in occupancy.
+        All pieces have to be of the same type (attacks are symmetric, so one AND with the attack mask
+        of the square is enough).
+        :param square: The square index (row * board_size + col) of the piece to be checked, must not be occupied
+        :param occupancy: The occupancy mask of the other pieces, see encode_mask
+        :param board_size: The size of the board
+        :return: True if the piece on square is not attacked
+
+        >>> Queen.non_attacking_configuration(2, encode_mask({(1, 0)}, 4), 4), Queen.non_attacking_configuration(6, encode_mask({(1, 0)}, 4), 4)
+        (True, False)
         """
-        pass
+        return not cls.attack_table(board_size)[square] & occupancy
 
 
 class Queen(Piece):
-    @staticmethod
-    def non_attacking_configuration(piece_to_check, other_pieces, board_size):
-        for enemy_queen in other_pieces:
-            attack_each_other = (abs(enemy_queen[0] - piece_to_check[0]) == abs(enemy_queen[1] - piece_to_check[1])
-                                 or enemy_queen[0] == piece_to_check[0]
-                                 or enemy_queen[1] == piece_to_check[1])
-            if attack_each_other:
-                return False
+    steps = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+    sliding = True
 
-        return True
+class Rook(Piece):
+    steps = [(-1, 0), (0, -1), (0, 1), (1, 0)]
+    sliding = True
+
+class Bishop(Piece):
+    steps = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+    sliding = True
+
+class King(Piece):
+    steps = Queen.steps
 
 class Knight(Piece):
     moves = [
@@ -43,36 +99,9 @@ class Knight(Piece):
         (1, -2),
         (-1, -2)
     ]
-    pos_to_targets = None
-
-    @staticmethod
-    def is_out_of_bounce(board_size: int, position: tuple[int, int]):
-        return position[0] < 0 or position[0] >= board_size or position[1] < 0 or position[1] >= board_size
-
-    @staticmethod
-    def calculate_target_pos(board_size: int):
-        pos_to_targets = {}
-        for i in range(board_size):
-            for j in range(board_size):
-                position = (i, j)
-                valid_targets = set()
-                for move in Knight.moves:
-                    target = (position[0] + move[0], position[1] + move[1])
-                    if not Knight.is_out_of_bounce(board_size, target):
-                        valid_targets.add(target)
-                pos_to_targets[position] = valid_targets
-
-        Knight.pos_to_targets = pos_to_targets
+    steps = moves
 
-
-
-    @staticmethod
-    def non_attacking_configuration(piece_to_check, other_pieces, board_size):
-        if Knight.pos_to_targets is None:
-            Knight.calculate_target_pos(board_size)
-
-        target_set = Knight.pos_to_targets[piece_to_check]
-        return not any(position in target_set for position in other_pieces)
+piece_types = {"queen": Queen, "rook": Rook, "bishop": Bishop, "king": King, "knight": Knight}
 
 def calculate_non_attacking_pos(piece_type: type[Piece], start_pos: tuple[int, int] = (0,0), board_size: int = 8, piece_positions: list[tuple[int, int]] = None):
     """
@@ -81,30 +110,222 @@ def calculate_non_attacking_pos(piece_type: type[Piece], start_pos: tuple[int, i
     :param start_pos: The current pos to traverse at
     :param board_size: The size of the board
     :param piece_positions: The current piece positions
-    :return: The first piece configuration that meet the criteria
+    :return: All piece configurations with the most pieces (see iter_non_attacking_pos for a lazy version)
     """
-    if piece_positions is None:
-        piece_positions = set()
+    return list(iter_non_attacking_pos(piece_type, board_size, start_pos=start_pos, piece_positions=piece_positions))
 
-    best_positions = [frozenset(piece_positions)]
-    curr_pos = start_pos
-    while curr_pos[0] != board_size:
-        if piece_type.non_attacking_configuration(curr_pos, piece_positions, board_size):
-            piece_positions.add(curr_pos)
+def count_non_attacking_pos(piece_type: type[Piece], board_size: int = 8, start_pos: tuple[int, int] = (0, 0), piece_positions: list[tuple[int, int]] = None) -> tuple[int, int]:
+    """
+    Count-only mode of calculate_non_attacking_pos, no configuration is stored.
+    :param piece_type: The type of piece to place. (f.e. "Queen", "Knight", ...)
+    :param board_size: The size of the board
+    :param start_pos: The first field where pieces may be placed (fields are visited row by row)
+    :param piece_positions: Pieces that are already placed
+    :return: (most pieces that can be placed, number of configurations with that many pieces)
 
-            result = calculate_non_attacking_pos(piece_type, to_next_field(curr_pos, board_size), board_size, piece_positions)
-            result_length = len(result[0])
-            best_positions_length = len(best_positions[0])
-            if result_length > best_positions_length:
-                best_positions = result.copy()
-            elif result_length == best_positions_length:
-                best_positions.extend(result.copy())
+    >>> count_non_attacking_pos(Queen, 6)
+    (6, 4)
+    """
+    table = piece_type.attack_table(board_size)
+    squares = board_size * board_size
+    occupancy = encode_mask(piece_positions or (), board_size)
+    best = [occupancy.bit_count(), 0]  # größte Anzahl Figuren, Anzahl Konfigurationen dieser Größe
+
+    def search(index: int, occupancy: int, placed_pieces: int):
+        placed = False
+        for i in range(index, squares):
+            if placed_pieces + squares - i < best[0]:
+                break  # auch mit allen restlichen Feldern nicht mehr gleich viele Figuren
+            if not table[i] & occupancy:
+                placed = True
+                search(i + 1, occupancy | (1 << i), placed_pieces + 1)
+        if not placed:
+            if placed_pieces > best[0]:
+                best[:] = [placed_pieces, 1]
+            elif placed_pieces == best[0]:
+                best[1] += 1
+
+    search(start_pos[0] * board_size + start_pos[1], occupancy, best[0])
+    return best[0], best[1]
+
+def encode_mask(positions: set[tuple[int, int]], board_size: int) -> int:
+    """
+    The positions as occupancy mask, bit row * board_size + col (fits in 64 bits up to 8x8).
 
-            piece_positions.remove(curr_pos)
+    >>> encode_mask({(0, 1), (1, 0)}, 8)
+    258
+    """
+    mask = 0
+    for row, col in positions:
+        mask |= 1 << (row * board_size + col)
+    return mask
 
-        curr_pos = to_next_field(curr_pos, board_size)
+def decode_mask(mask: int, board_size: int) -> list[tuple[int, int]]:
+    """
+    Reverses encode_mask.
+
+    >>> decode_mask(258, 8)
+    [(0, 1), (1, 0)]
+    """
+    positions = []
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        positions.append(divmod(bit.bit_length() - 1, board_size))
+    return positions
+
+def encode_rows(mask: int, board_size: int) -> tuple[int, ...]:
+    """
+    An occupancy mask as one column index per row (-1 = empty row), only for at most one piece per row.
 
-    return best_positions
+    >>> encode_rows(encode_mask({(0, 1), (2, 0)}, 3), 3)
+    (1, -1, 0)
+    """
+    rows = [-1] * board_size
+    for row, col in decode_mask(mask, board_size):
+        if rows[row] != -1:
+            raise ValueError("the rows encoding needs at most one piece per row")
+        rows[row] = col
+    return tuple(rows)
+
+# Umwandlung der Belegungsmaske einer gefundenen Konfiguration
+configuration_encodings = {
+    "positions": lambda mask, board_size: frozenset(decode_mask(mask, board_size)),
+    "mask": lambda mask, board_size: mask,
+    "rows": encode_rows,
+}
+
+def iter_non_attacking_pos(piece_type: type[Piece], board_size: int = 8, encoding: str = "positions", pieces: int = None, start_pos: tuple[int, int] = (0, 0), piece_positions: list[tuple[int, int]] = None):
+    """
+    Yields the piece configurations with the most pieces one by one, in the order of calculate_non_attacking_pos.
+    If pieces is not given, the maximum is found with count_non_attacking_pos first, so only the current
+    path of the search is kept in memory.
+    :param piece_type: The type of piece to place. (f.e. "Queen", "Knight", ...)
+    :param board_size: The size of the board
+    :param encoding: Name of the encoding in configuration_encodings
+    :param pieces: Yield the configurations with exactly this many pieces
+    :param start_pos: The first field where pieces may be placed (fields are visited row by row)
+    :param piece_positions: Pieces that are already placed
+    :return: Generator of encoded configurations
+
+    >>> list(iter_non_attacking_pos(Queen, 4, "rows"))
+    [(1, 3, 0, 2), (2, 0, 3, 1)]
+    """
+    table = piece_type.attack_table(board_size)
+    squares = board_size * board_size
+    encode = configuration_encodings[encoding]
+    occupancy = encode_mask(piece_positions or (), board_size)
+    if pieces is None:
+        pieces = count_non_attacking_pos(piece_type, board_size, start_pos, piece_positions)[0]
+
+    def search(index: int, occupancy: int, placed_pieces: int):
+        if placed_pieces == pieces:
+            yield encode(occupancy, board_size)
+            return
+        for i in range(index, squares):
+            if placed_pieces + squares - i < pieces:
+                return
+            if not table[i] & occupancy:
+                yield from search(i + 1, occupancy | (1 << i), placed_pieces + 1)
+
+    yield from search(start_pos[0] * board_size + start_pos[1], occupancy, occupancy.bit_count())
+
+# Höchstanzahl gespeicherter oberer Schranken bei max_non_attacking(memo=True)
+MEMO_LIMIT = 1 << 20
+
+def max_non_attacking(piece_type: type[Piece], board_size: int = 8, all_solutions: bool = False, memo: bool = True, encoding: str = "mask") -> tuple[int, list]:
+    """
+    Branch and bound search for the most non-attacking pieces (maximum independent set of the attack graph).
+    The search branches on the first free square (place a piece there or not) and cuts a branch when
+    the placed pieces plus an upper bound for the free squares cannot beat (or, for all_solutions, reach)
+    the best result. The bound is the sum of per-row limits: the most pieces that fit into the free
+    squares of each row on their own. With memo, the bound of every finished set of free squares is
+    tightened to what the search has shown and stored by its occupancy mask.
+    :param piece_type: The type of piece to place. (f.e. "Queen", "Knight", ...)
+    :param board_size: The size of the board
+    :param all_solutions: Return all optimal placements (same order as calculate_non_attacking_pos) instead of one
+    :param memo: Store upper bounds per set of free squares
+    :param encoding: Name of the encoding in configuration_encodings
+    :return: (most pieces, list of encoded placements with that many pieces)
+
+    >>> max_non_attacking(Knight, 6)[0], len(max_non_attacking(Knight, 6, all_solutions=True)[1])
+    (18, 2)
+    >>> max_non_attacking(Queen, 6, all_solutions=True, encoding="rows")[1] == list(iter_non_attacking_pos(Queen, 6, "rows"))
+    True
+    """
+    table = piece_type.attack_table(board_size)
+    encode = configuration_encodings[encoding]
+    row_mask = (1 << board_size) - 1
+    row_attacks = [table[col] & row_mask for col in range(board_size)]
+    capacities = {0: 0}  # freie Felder einer Reihe -> meiste Figuren darin
+    upper = {}           # freie Felder -> obere Schranke für die Anzahl weiterer Figuren
+
+    def capacity(bits: int) -> int:
+        value = capacities.get(bits)
+        if value is None:
+            low = bits & -bits
+            rest = bits ^ low
+            value = max(capacity(rest), 1 + capacity(rest & ~row_attacks[low.bit_length() - 1]))
+            capacities[bits] = value
+        return value
+
+    def bound(free: int) -> int:
+        value = upper.get(free)
+        if value is not None:
+            return value
+        value = 0
+        while free:
+            shift = (free & -free).bit_length() - 1
+            shift -= shift % board_size  # Anfang der Reihe
+            value += capacity((free >> shift) & row_mask)
+            free &= ~(row_mask << shift)
+        return value
+
+    def remember(free: int, value: int):
+        if memo and (free in upper or len(upper) < MEMO_LIMIT):
+            upper[free] = min(value, upper.get(free, value))
+
+    best = [0, 0]  # meiste Figuren, Belegung
+
+    def search(free: int, occupancy: int, placed: int):
+        if placed > best[0]:
+            best[:] = [placed, occupancy]
+        if not free:
+            return
+        limit = bound(free)
+        if placed + limit <= best[0]:
+            remember(free, limit)
+            return
+        square = free & -free
+        search(free & ~table[square.bit_length() - 1] & ~square, occupancy | square, placed + 1)
+        search(free & ~square, occupancy, placed)
+        remember(free, min(limit, best[0] - placed))
+
+    squares = board_size * board_size
+    search((1 << squares) - 1, 0, 0)
+    target = best[0]
+    if not all_solutions:
+        return target, [encode(best[1], board_size)]
+
+    solutions = []
+
+    def enumerate_all(free: int, occupancy: int, placed: int):
+        if placed == target:
+            solutions.append(encode(occupancy, board_size))
+            return
+        limit = bound(free)
+        if placed + limit < target:
+            remember(free, limit)
+            return
+        found = len(solutions)
+        square = free & -free
+        enumerate_all(free & ~table[square.bit_length() - 1] & ~square, occupancy | square, placed + 1)
+        enumerate_all(free & ~square, occupancy, placed)
+        # ohne Treffer fehlt hier mindestens eine Figur, sonst ist target - placed erreicht
+        remember(free, target - placed - (len(solutions) == found))
+
+    enumerate_all((1 << squares) - 1, 0, 0)
+    return target, solutions
 
 def to_next_field(field: tuple[int, int], board_size: int):
     """
@@ -123,32 +344,44 @@ def to_next_field(field: tuple[int, int], board_size: int):
 def calculate_queens(curr_row: int = 0, number_of_queens_to_place: int = 8, board_size: int = 8, queen_positions: list[tuple[int, int]] = None):
     """
     Calculates the amount of queens that can be placed on the board without attacking themselves.
+    Occupied columns and diagonals are kept as bitmasks, the free columns of a row are one AND.
     :param curr_row: The current row to target (default: 0) - This parameter should always be 0
     :param number_of_queens_to_place: The number of queens to be placed (default: 8)
     :param board_size: The size of the board
-    :param queen_positions: The current queen positions
+    :param queen_positions: The current queen positions (in the rows above curr_row)
     :return: The first queen positions that meet the criteria
     """
     if queen_positions is None:
         queen_positions = set()
 
-    if number_of_queens_to_place == 0:
-        return queen_positions
-
-    if curr_row >= board_size:
-        return None
-
-    for col in range(board_size):
-        curr_pos = (curr_row, col)
-        if valid_queen_pos(queen_positions, curr_pos):
-            queen_positions.add(curr_pos)
-
-            result = calculate_queens(curr_row + 1, number_of_queens_to_place-1, board_size, queen_positions)
-            if result:
-                return result
-            queen_positions.remove(curr_pos)
+    # Spalten und Diagonalen der schon gesetzten Damen, auf curr_row projiziert
+    columns = left = right = 0
+    for row, col in queen_positions:
+        columns |= 1 << col
+        left |= 1 << (col + curr_row - row)
+        if col >= curr_row - row:
+            right |= 1 << (col - curr_row + row)
 
+    mask = (1 << board_size) - 1
 
+    def place(row: int, to_place: int, columns: int, left: int, right: int) -> bool:
+        if to_place == 0:
+            return True
+        if row >= board_size:
+            return False
+        free = mask & ~(columns | left | right)
+        while free:
+            bit = free & -free  # niedrigstes freies Bit = kleinste freie Spalte
+            free ^= bit
+            queen_positions.add((row, bit.bit_length() - 1))
+            if place(row + 1, to_place - 1, columns | bit, (left | bit) << 1, (right | bit) >> 1):
+                return True
+            queen_positions.remove((row, bit.bit_length() - 1))
+        return False
+
+    if place(curr_row, number_of_queens_to_place, columns, left, right):
+        return queen_positions
+    return None
 
 def valid_queen_pos(placed_queens: list[tuple[int, int]], queen: tuple[int, int]):
     """
@@ -166,6 +399,374 @@ def valid_queen_pos(placed_queens: list[tuple[int, int]], queen: tuple[int, int]
 
     return True
 
+def queens_solutions(board_size: int = 8):
+    """
+    Yields all solutions of the N-Queens problem as tuple of one column per row.
+    Bitmask backtracking, the first queen is only placed in the left half, every solution is yielded
+    together with its mirror image.
+    :param board_size: The size of the board
+    :return: Generator of column tuples
+
+    >>> sorted(queens_solutions(4))
+    [(1, 3, 0, 2), (2, 0, 3, 1)]
+    >>> sum(1 for _ in queens_solutions(8))
+    92
+    """
+    mask = (1 << board_size) - 1
+    columns = [0] * board_size
+
+    def place(row: int, used: int, left: int, right: int):
+        if row == board_size:
+            solution = tuple(columns)
+            yield solution
+            if board_size > 1 and solution[0] * 2 + 1 != board_size:
+                yield tuple(board_size - 1 - col for col in solution)  # Spiegelbild
+            return
+        free = mask & ~(used | left | right)
+        if row == 0:
+            free &= (1 << ((board_size + 1) // 2)) - 1  # erste Dame nur in der linken Hälfte (inkl. Mitte)
+        while free:
+            bit = free & -free
+            free ^= bit
+            columns[row] = bit.bit_length() - 1
+            yield from place(row + 1, used | bit, (left | bit) << 1, (right | bit) >> 1)
+
+    yield from place(0, 0, 0, 0)
+
+def count_queens(board_size: int = 8) -> tuple[int, int]:
+    """
+    Counts the solutions of the N-Queens problem. Only one solution per class of rotations and
+    reflections is searched (Takaken's method): the first queen is restricted to the corner or the left
+    half, the remaining symmetries are cut by masks during the search, and every found solution
+    is checked against its rotations, so about 1/8 of the search tree is visited.
+    :param board_size: The size of the board
+    :return: (number of solutions, number of solutions that are unique up to symmetry)
+
+    >>> [count_queens(n) for n in range(1, 11)]
+    [(1, 1), (0, 0), (0, 0), (2, 1), (10, 2), (4, 1), (40, 6), (92, 12), (352, 46), (724, 92)]
+    """
+    if board_size < 4:
+        total = sum(1 for _ in queens_solutions(board_size))
+        return total, total
+
+    last = board_size - 1
+    top_bit = 1 << last
+    mask = (1 << board_size) - 1
+    board = [0] * board_size  # Bit der Dame pro Reihe
+    counts = {2: 0, 4: 0, 8: 0}  # Lösungen, die sich nach 2, 4 oder 8 Symmetrien wiederholen
+    bound1 = bound2 = side_mask = last_mask = end_bit = 0
+
+    def corner(row: int, left: int, down: int, right: int):
+        # erste Dame in der Ecke: nur Spiegelung an der Diagonale möglich, kein Rotationstest nötig
+        free = mask & ~(left | down | right)
+        if row == last:
+            if free:
+                board[row] = free
+                counts[8] += 1
+            return
+        if row < bound1:
+            free &= ~2
+        while free:
+            bit = free & -free
+            free ^= bit
+            board[row] = bit
+            corner(row + 1, (left | bit) << 1, down | bit, (right | bit) >> 1)
+
+    def edge(row: int, left: int, down: int, right: int):
+        free = mask & ~(left | down | right)
+        if row == last:
+            if free and not (free & last_mask):
+                board[row] = free
+                check_symmetry()
+            return
+        if row < bound1:
+            free &= ~side_mask
+        elif row == bound2:
+            if not (down & side_mask):
+                return
+            if (down & side_mask) != side_mask:
+                free &= side_mask
+        while free:
+            bit = free & -free
+            free ^= bit
+            board[row] = bit
+            edge(row + 1, (left | bit) << 1, down | bit, (right | bit) >> 1)
+
+    def check_symmetry():
+        # 90 Grad
+        if board[bound2] == 1:
+            own, pattern = 1, 2
+            while own <= last:
+                bit, you = 1, last
+                while board[you] != pattern and board[own] >= bit:
+                    bit <<= 1
+                    you -= 1
+                if board[own] > bit:
+                    return
+                if board[own] < bit:
+                    break
+                own += 1
+                pattern <<= 1
+            if own > last:
+                counts[2] += 1
+                return
+        # 180 Grad
+        if board[last] == end_bit:
+            own, you = 1, last - 1
+            while own <= last:
+                bit, pattern = 1, top_bit
+                while board[you] != pattern and board[own] >= bit:
+                    bit <<= 1
+                    pattern >>= 1
+                if board[own] > bit:
+                    return
+                if board[own] < bit:
+                    break
+                own += 1
+                you -= 1
+            if own > last:
+                counts[4] += 1
+                return
+        # 270 Grad
+        if board[bound1] == top_bit:
+            own, pattern = 1, top_bit >> 1
+            while own <= last:
+                bit, you = 1, 0
+                while board[you] != pattern and board[own] >= bit:
+                    bit <<= 1
+                    you += 1
+                if board[own] > bit:
+                    return
+                if board[own] < bit:
+                    break
+                own += 1
+                pattern >>= 1
+        counts[8] += 1
+
+    board[0] = 1
+    for bound1 in range(2, last):
+        board[1] = bit = 1 << bound1
+        corner(2, (2 | bit) << 1, 1 | bit, bit >> 1)
+
+    side_mask = last_mask = top_bit | 1
+    end_bit = top_bit >> 1
+    bound1, bound2 = 1, board_size - 2
+    while bound1 < bound2:
+        board[0] = bit = 1 << bound1
+        edge(1, bit << 1, bit, bit >> 1)
+        last_mask |= last_mask >> 1 | last_mask << 1
+        end_bit >>= 1
+        bound1 += 1
+        bound2 -= 1
+
+    return 8 * counts[8] + 4 * counts[4] + 2 * counts[2], counts[8] + counts[4] + counts[2]
+
+def _timed(task):
+    """Runs one subproblem in a worker and measures it: (result, seconds, worker pid)."""
+    function, arguments = task
+    start_time = time.perf_counter()
+    result = function(*arguments)
+    return result, time.perf_counter() - start_time, os.getpid()
+
+def run_subproblems(function, arguments: list[tuple], workers: int = 1) -> tuple[list, dict[int, list]]:
+    """
+    Runs function(*args) for every args of arguments, with workers > 1 on a process pool.
+    :param function: A module level function (has to be picklable)
+    :param arguments: The argument tuples of the subproblems
+    :param workers: Number of worker processes (1 = serial)
+    :return: (results in the order of arguments, worker pid -> [number of subproblems, busy seconds])
+    """
+    tasks = [(function, args) for args in arguments]
+    if workers <= 1:
+        outputs = map(_timed, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(_timed, tasks))
+
+    results = []
+    load = {}
+    for result, seconds, pid in outputs:
+        results.append(result)
+        entry = load.setdefault(pid, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+    return results, load
+
+def queens_subproblems(board_size: int, depth: int) -> list[tuple[int, ...]]:
+    """
+    All valid placements of the first depth rows (one column per row), the first queen only in the left half.
+    :param board_size: The size of the board
+    :param depth: Number of rows to place (at least 1, the mirroring needs the first queen)
+    :return: List of column tuples
+    """
+    mask = (1 << board_size) - 1
+    depth = max(1, min(depth, board_size))
+    prefixes = []
+
+    def place(prefix: list[int], used: int, left: int, right: int):
+        if len(prefix) == depth:
+            prefixes.append(tuple(prefix))
+            return
+        free = mask & ~(used | left | right)
+        if not prefix:
+            free &= (1 << ((board_size + 1) // 2)) - 1
+        while free:
+            bit = free & -free
+            free ^= bit
+            prefix.append(bit.bit_length() - 1)
+            place(prefix, used | bit, (left | bit) << 1, (right | bit) >> 1)
+            prefix.pop()
+
+    place([], 0, 0, 0)
+    return prefixes
+
+def complete_queens(board_size: int, prefix: tuple[int, ...], collect: bool = False) -> tuple[int, list[tuple[int, ...]]]:
+    """
+    Counts (and optionally collects) all N-Queens solutions that start with the given rows.
+    :param board_size: The size of the board
+    :param prefix: Columns of the queens in the first rows
+    :param collect: Also return the solutions
+    :return: (number of solutions, solutions as column tuples or [])
+    """
+    mask = (1 << board_size) - 1
+    used = left = right = 0
+    for col in prefix:
+        bit = 1 << col
+        used, left, right = used | bit, (left | bit) << 1, (right | bit) >> 1
+    columns = list(prefix) + [0] * (board_size - len(prefix))
+    solutions = []
+    count = 0
+
+    def place(row: int, used: int, left: int, right: int):
+        nonlocal count
+        if row == board_size:
+            count += 1
+            if collect:
+                solutions.append(tuple(columns))
+            return
+        free = mask & ~(used | left | right)
+        while free:
+            bit = free & -free
+            free ^= bit
+            columns[row] = bit.bit_length() - 1
+            place(row + 1, used | bit, (left | bit) << 1, (right | bit) >> 1)
+
+    place(len(prefix), used, left, right)
+    return count, solutions
+
+def count_queens_parallel(board_size: int = 8, workers: int = 1, split_depth: int = 2, collect: bool = False) -> tuple[int, list[tuple[int, ...]], dict[int, list]]:
+    """
+    Solves the N-Queens problem on a process pool: all placements of the first split_depth rows
+    are independent subproblems. The first queen is only placed in the left half, the results of the
+    other half are the mirror images.
+    :param board_size: The size of the board
+    :param workers: Number of worker processes
+    :param split_depth: Number of rows placed before splitting
+    :param collect: Also return all solutions
+    :return: (number of solutions, solutions as column tuples or [], load per worker, see run_subproblems)
+
+    >>> count_queens_parallel(8, workers=2)[0]
+    92
+    >>> sorted(count_queens_parallel(4, collect=True)[1])
+    [(1, 3, 0, 2), (2, 0, 3, 1)]
+    >>> count_queens_parallel(6, split_depth=0)[0]
+    4
+    """
+    prefixes = queens_subproblems(board_size, split_depth)
+    results, load = run_subproblems(complete_queens, [(board_size, prefix, collect) for prefix in prefixes], workers)
+
+    total = 0
+    solutions = []
+    for prefix, (count, found) in zip(prefixes, results):
+        mirrored = board_size > 1 and prefix[0] * 2 + 1 != board_size
+        total += 2 * count if mirrored else count
+        solutions.extend(found)
+        if mirrored:
+            solutions.extend(tuple(board_size - 1 - col for col in solution) for solution in found)
+    return total, solutions, load
+
+def calculate_non_attacking_pos_parallel(piece_type: type[Piece], board_size: int = 8, workers: int = 1, split_depth: int = 2) -> tuple[list[frozenset], dict[int, list]]:
+    """
+    Same result as calculate_non_attacking_pos, but the search tree is split after split_depth placed pieces,
+    the subtrees are searched on a process pool and merged in the original order.
+    :param piece_type: The type of piece to place. (f.e. "Queen", "Knight", ...)
+    :param board_size: The size of the board
+    :param workers: Number of worker processes
+    :param split_depth: Number of pieces placed before splitting
+    :return: (all piece configurations with the most pieces, load per worker, see run_subproblems)
+
+    >>> calculate_non_attacking_pos_parallel(Queen, 5, 2)[0] == calculate_non_attacking_pos(Queen, board_size=5)
+    True
+    """
+    candidates = []  # Konfigurationen der Knoten oberhalb der Teilungstiefe, None = Teilproblem
+    tasks = []
+
+    # die Belegungsmaske wird pro Platzierung um ein Bit erweitert, nicht aus den Positionen neu aufgebaut
+    def expand(index: int, occupancy: int, depth: int):
+        if depth == split_depth:
+            candidates.append(None)
+            tasks.append((piece_type, divmod(index, board_size), board_size, occupancy))
+            return
+        candidates.append([frozenset(decode_mask(occupancy, board_size))])
+        for square in range(index, board_size * board_size):
+            if piece_type.non_attacking_configuration(square, occupancy, board_size):
+                expand(square + 1, occupancy | (1 << square), depth + 1)
+
+    expand(0, 0, 0)
+    results, load = run_subproblems(_non_attacking_subtree, tasks, workers)
+
+    results = iter(results)
+    best_positions = []
+    for configurations in candidates:
+        if configurations is None:
+            configurations = next(results)
+        if not best_positions or len(configurations[0]) > len(best_positions[0]):
+            best_positions = list(configurations)
+        elif len(configurations[0]) == len(best_positions[0]):
+            best_positions.extend(configurations)
+    return best_positions, load
+
+def _non_attacking_subtree(piece_type: type[Piece], start_pos: tuple[int, int], board_size: int, occupancy: int):
+    return calculate_non_attacking_pos(piece_type, start_pos, board_size, decode_mask(occupancy, board_size))
+
+def print_load_balance(load: dict[int, list]):
+    """
+    Prints the number of subproblems and the busy time of every worker.
+    :param load: worker pid -> [number of subproblems, busy seconds], see run_subproblems
+    """
+    for number, (pid, (tasks, seconds)) in enumerate(sorted(load.items()), 1):
+        print(f"worker {number} (pid {pid}): {tasks} subproblems, {seconds:.3f}s")
+    busy = [seconds for _, seconds in load.values()]
+    if busy and sum(busy) > 0:
+        print(f"imbalance (max / mean busy time): {max(busy) / (sum(busy) / len(busy)):.2f}")
+
+def benchmark_max_non_attacking(pieces: list[type[Piece]], sizes: list[int], budget: float = 10.0) -> list[tuple[str, int, int, int, float | None, float]]:
+    """
+    Compares the exhaustive count_non_attacking_pos with max_non_attacking(all_solutions=True).
+    Once the exhaustive search of a piece takes longer than budget seconds, it is skipped for the larger boards.
+    :param pieces: The piece types
+    :param sizes: The board sizes
+    :param budget: Seconds after which the exhaustive search is not run for larger boards
+    :return: list of (piece, board_size, most_pieces, configurations, exhaustive_ms or None, branch_and_bound_ms)
+    """
+    results = []
+    for piece_type in pieces:
+        exhaustive = True
+        for board_size in sorted(sizes):
+            exhaustive_ms = None
+            if exhaustive:
+                start_time = time.perf_counter()
+                expected = count_non_attacking_pos(piece_type, board_size)
+                exhaustive_ms = (time.perf_counter() - start_time) * 1000
+                exhaustive = exhaustive_ms < budget * 1000
+
+            start_time = time.perf_counter()
+            most, placements = max_non_attacking(piece_type, board_size, all_solutions=True)
+            bnb_ms = (time.perf_counter() - start_time) * 1000
+            if exhaustive_ms is not None:
+                assert expected == (most, len(placements)), (piece_type.__name__, board_size)
+            results.append((piece_type.__name__, board_size, most, len(placements), exhaustive_ms, bnb_ms))
+    return results
 
 def print_board(board_size: int, positions: list[tuple[int, int]]):
     """
@@ -183,17 +784,70 @@ def print_board(board_size: int, positions: list[tuple[int, int]]):
     for position in positions:
         grid[len(grid) - 1 - position[0]][position[1]] = 'O'
 
-    for line in grid:
-        for char in line:
-            print(char, end = "")
-        print()
+    print("\n".join("".join(line) for line in grid))
 
 if __name__ == "__main__":
-    board_size = 7
-    positions = calculate_non_attacking_pos(Queen, board_size=board_size)
-
-    print("Number of possible configurations:", len(positions))
-    print("Possible Positions")
-    for pos in positions:
-        print_board(board_size, pos)
-        print()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Non-attacking pieces and N-Queens.")
+    parser.add_argument("mode", nargs="?", choices=["pieces", "queens", "bnb", "benchmark"], default="pieces",
+                        help="pieces: all configurations with the most non-attacking pieces, queens: count N-Queens solutions, "
+                             "bnb: most non-attacking pieces with branch and bound, benchmark: exhaustive search against bnb")
+    parser.add_argument("-n", "--board-size", type=int, default=7, help="Size of the board (default: 7)")
+    parser.add_argument("-p", "--piece", choices=list(piece_types), default=None,
+                        help="Piece type (default: queen, in benchmark mode all pieces)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Number of worker processes (default: 1)")
+    parser.add_argument("-d", "--split-depth", type=int, default=2, help="Placed pieces/rows before splitting (default: 2)")
+    parser.add_argument("-c", "--count", action="store_true", help="Only count the configurations (pieces mode)")
+    parser.add_argument("-a", "--all", action="store_true", help="Print all optimal placements (bnb mode)")
+    parser.add_argument("-s", "--sizes", type=int, nargs="+", default=[4, 5, 6, 7], help="Board sizes (benchmark mode, default: 4 - 7)")
+    parser.add_argument("-b", "--budget", type=float, default=10.0,
+                        help="Seconds after which the exhaustive search is skipped for larger boards (benchmark mode, default: 10)")
+    args = parser.parse_args()
+
+    board_size = args.board_size
+    piece = args.piece or "queen"
+    start_time = time.perf_counter()
+    if args.mode == "queens":
+        if args.workers <= 1:
+            total, unique = count_queens(board_size)
+            print(f"{board_size}-Queens: {total} solutions, {unique} unique")
+        else:
+            total, _, load = count_queens_parallel(board_size, args.workers, args.split_depth)
+            print(f"{board_size}-Queens: {total} solutions")
+            print_load_balance(load)
+    elif args.mode == "bnb":
+        most, placements = max_non_attacking(piece_types[piece], board_size, all_solutions=args.all)
+        print(f"Most non-attacking {piece}s: {most}" + (f", {len(placements)} placements" if args.all else ""))
+        for mask in placements:
+            print_board(board_size, decode_mask(mask, board_size))
+            print()
+    elif args.mode == "benchmark":
+        print(f"{'piece':>8} {'size':>5} {'most':>5} {'configs':>8} {'exhaustive ms':>14} {'bnb ms':>10}")
+        for name, size, most, configurations, exhaustive_ms, bnb_ms in benchmark_max_non_attacking(
+                [piece_types[args.piece]] if args.piece else list(piece_types.values()),
+                args.sizes, args.budget):
+            exhaustive = f"{exhaustive_ms:>14.1f}" if exhaustive_ms is not None else f"{'skipped':>14}"
+            print(f"{name:>8} {size:>5} {most:>5} {configurations:>8} {exhaustive} {bnb_ms:>10.1f}")
+    else:
+        piece_type = piece_types[piece]
+        if args.count:
+            pieces, count = count_non_attacking_pos(piece_type, board_size)
+            print(f"Number of possible configurations: {count} ({pieces} pieces)")
+        elif args.workers <= 1:
+            # Konfigurationen werden beim Suchen ausgegeben, nicht gesammelt
+            count = 0
+            print("Possible Positions")
+            for mask in iter_non_attacking_pos(piece_type, board_size, "mask"):
+                print_board(board_size, decode_mask(mask, board_size))
+                print()
+                count += 1
+            print("Number of possible configurations:", count)
+        else:
+            positions, load = calculate_non_attacking_pos_parallel(piece_type, board_size, args.workers, args.split_depth)
+            print_load_balance(load)
+
+            print("Number of possible configurations:", len(positions))
+            print("Possible Positions")
+            for pos in positions:
+                print_board(board_size, pos)
+                print()
+    print(f"Time taken: {(time.perf_counter() - start_time) * 1000:.1f}ms")